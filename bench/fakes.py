@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+import json
+import re
+import time
+
+class FakeLLMClient:
+    """本地 LLM 替身，按固定延迟返回格式正确的结果"""
+
+    def __init__(self, latency=0.0, max_tokens=8000):
+        """
+        初始化 LLM 替身
+
+        Args:
+            latency: 每次调用模拟的响应延迟（秒）
+            max_tokens: 模拟的上下文长度
+        """
+        self.latency = latency
+        self.max_tokens = max_tokens
+        self.calls = 0
+
+    def count_tokens(self, text):
+        """粗略估算 token 数：中文约每字一个 token，英文约每4个字符一个 token"""
+        cjk = len(re.findall(r'[\u4e00-\u9fff]', text))
+        return cjk + (len(text) - cjk) // 4
+
+    def get_completion(self, prompt, system_prompt=None):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        if '"content"' in prompt:
+            return json.dumps({
+                'content': [
+                    {'type': 'heading1', 'text': '基准测试标题'},
+                    {'type': 'heading2', 'text': '基准测试小节'},
+                    {'type': 'paragraph', 'text': prompt[:200]},
+                ]
+            }, ensure_ascii=False)
+
+        # URL 筛选类请求：返回提示词中出现的前3个URL
+        urls = list(dict.fromkeys(re.findall(r'https?://[^\s"]+', prompt)))
+        return '\n'.join(urls[:3])
+
+class FakeDDGS:
+    """DuckDuckGo 搜索替身，返回指向本地语料服务的结果"""
+
+    urls = []
+    latency = 0.0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+    def text(self, query, max_results=10):
+        if self.latency:
+            time.sleep(self.latency)
+        return [
+            {
+                'title': f"{query} {i}",
+                'href': url,
+                'body': f"{query} 的本地基准测试页面 {i}",
+            }
+            for i, url in enumerate(self.urls[:max_results])
+        ]
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+from datetime import datetime
+import urllib.request
+import subprocess
+import argparse
+import resource
+import tempfile
+import types
+import json
+import math
+import time
+import sys
+import os
+
+# 将导入路径调整到上层目录
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from bench.fakes import FakeDDGS, FakeLLMClient
+from bench.server import CorpusServer
+
+class StageTimer:
+    """按阶段记录耗时样本"""
+
+    def __init__(self):
+        self.samples = {}
+
+    def time(self, stage, func, *args, **kwargs):
+        """执行函数并记录到指定阶段，返回函数结果"""
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.samples.setdefault(stage, []).append(time.perf_counter() - start)
+
+    def summary(self):
+        return {stage: summarize_samples(values) for stage, values in self.samples.items()}
+
+def percentile(values, pct):
+    """最近秩法计算百分位数"""
+    ordered = sorted(values)
+    index = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+def summarize_samples(values):
+    return {
+        'count': len(values),
+        'mean_ms': round(sum(values) / len(values) * 1000, 3),
+        'p50_ms': round(percentile(values, 50) * 1000, 3),
+        'p95_ms': round(percentile(values, 95) * 1000, 3),
+    }
+
+def resource_usage():
+    """返回当前进程及已回收子进程（浏览器、驱动）的峰值内存和 CPU 时间"""
+    # Linux 上 ru_maxrss 单位为 KB，macOS 上为字节
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    self_usage = resource.getrusage(resource.RUSAGE_SELF)
+    children_usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return {
+        'peak_rss_mb': {
+            'self': round(self_usage.ru_maxrss / scale, 1),
+            'children': round(children_usage.ru_maxrss / scale, 1),
+        },
+        'cpu_seconds': {
+            'self': round(self_usage.ru_utime + self_usage.ru_stime, 3),
+            'children': round(children_usage.ru_utime + children_usage.ru_stime, 3),
+        },
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+                              capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ''
+
+def load_insert_content():
+    """导入 scripts.insert_content，LLM 客户端缺失时用本地替身满足其导入"""
+    try:
+        import tools.llm_client
+    except ImportError:
+        module = types.ModuleType('tools.llm_client')
+        module.LLMClient = FakeLLMClient
+        sys.modules['tools.llm_client'] = module
+    from scripts import insert_content
+    return insert_content
+
+def fetch_http(url):
+    """不经浏览器直接获取原始 HTML"""
+    with urllib.request.urlopen(url) as response:
+        return response.read().decode('utf-8')
+
+def run_benchmark(urls, args):
+    """依次测量搜索、抓取、解析和总结各阶段"""
+    from tools import search, web_access
+    insert_content = load_insert_content()
+
+    timer = StageTimer()
+    llm_client = FakeLLMClient(latency=args.llm_latency)
+    pages = []
+
+    # 搜索阶段：DDG 替换为本地替身
+    FakeDDGS.urls = urls
+    searcher = search.DuckDuckGoSearcher(ddgs_factory=FakeDDGS)
+    for _ in range(args.repeat):
+        timer.time('search', searcher.search, '西湖 旅游 景点介绍')
+
+    # 抓取和解析阶段
+    for _ in range(args.repeat):
+        for url in urls:
+            if args.no_browser:
+                html = timer.time('fetch_http', fetch_http, url)
+                content = timer.time('extract_content', web_access.extract_content, html, url)
+            else:
+                driver = web_access.ChromeDriver()
+                try:
+                    timer.time('browser_startup', driver.create_driver)
+                    if args.extract_mode == 'dom':
+                        dom_data, current_url = timer.time('page_load', driver.get_page_dom, url, wait_time=args.wait)
+                    else:
+                        html, current_url = timer.time('page_load', driver.get_page_content, url, wait_time=args.wait)
+                finally:
+                    driver.quit()
+                if args.extract_mode == 'dom':
+                    content = timer.time('extract_dom_content', web_access.extract_dom_content, dom_data, current_url)
+                else:
+                    content = timer.time('extract_content', web_access.extract_content, html, current_url)
+            pages.append({'url': url, 'content': content})
+
+    # 端到端并发抓取
+    pages_per_sec = None
+    if not args.no_browser:
+        batch = urls * args.repeat
+        start = time.perf_counter()
+        timer.time('process_urls', web_access.process_urls, batch, max_workers=args.workers,
+                   extract_mode=args.extract_mode, tabs=args.tabs)
+        pages_per_sec = round(len(batch) / (time.perf_counter() - start), 3)
+
+    # 总结阶段：LLM 替换为本地替身，测量分段和 token 计数开销
+    url_results = {'results': pages[:len(urls)]}
+    for _ in range(args.repeat):
+        timer.time('summarize', insert_content.summarize_content_with_llm, llm_client, 'bench', url_results)
+
+    parity_mismatches = None
+    if args.check_parity and not args.no_browser:
+        parity_mismatches = check_parity(urls, args.wait)
+
+    return {
+        'stages': timer.summary(),
+        'parity_mismatches': parity_mismatches,
+        'pages_per_sec': pages_per_sec,
+        'llm_calls': llm_client.calls,
+    }
+
+def check_parity(urls, wait_time):
+    """分别用 html 和 dom 两种方式提取同一批页面，返回结果不一致的URL列表"""
+    from tools import web_access
+
+    mismatches = []
+    driver = web_access.ChromeDriver(reused=True)
+    try:
+        for url in urls:
+            html, current_url = driver.get_page_content(url, wait_time=wait_time)
+            html_content = web_access.extract_content(html, current_url)
+            dom_data, current_url = driver.get_page_dom(url, wait_time=wait_time)
+            dom_content = web_access.extract_dom_content(dom_data, current_url)
+            if html_content != dom_content:
+                mismatches.append(url)
+                print(f"[DEBUG] html 与 dom 提取结果不一致: {url}")
+    finally:
+        driver.quit()
+    return mismatches
+
+def compare_results(current, baseline, threshold):
+    """
+    与基线结果比较，打印各阶段变化
+
+    Returns:
+        bool: 是否存在超过阈值的性能回退
+    """
+    regressed = False
+    print(f"\n与基线 {baseline.get('commit', '')} ({baseline.get('timestamp', '')}) 比较:")
+    for stage, stats in current['stages'].items():
+        base = baseline.get('stages', {}).get(stage)
+        if not base:
+            print(f"  {stage}: 基线中不存在")
+            continue
+        for key in ('p50_ms', 'p95_ms'):
+            if not base[key]:
+                continue
+            change = (stats[key] - base[key]) / base[key]
+            flag = ''
+            if change > threshold:
+                flag = '  <-- 回退'
+                regressed = True
+            print(f"  {stage} {key}: {base[key]} -> {stats[key]} ({change:+.1%}){flag}")
+
+    if current.get('pages_per_sec') and baseline.get('pages_per_sec'):
+        change = (current['pages_per_sec'] - baseline['pages_per_sec']) / baseline['pages_per_sec']
+        flag = ''
+        if change < -threshold:
+            flag = '  <-- 回退'
+            regressed = True
+        print(f"  pages/sec: {baseline['pages_per_sec']} -> {current['pages_per_sec']} ({change:+.1%}){flag}")
+    return regressed
+
+def main():
+    parser = argparse.ArgumentParser(description='抓取/解析/总结流水线的可复现基准测试')
+    parser.add_argument('--repeat', type=int, default=3, help='每个阶段重复次数，默认3')
+    parser.add_argument('--wait', type=float, default=2, help='每个页面加载等待时间（秒），默认2秒')
+    parser.add_argument('--workers', type=int, default=5, help='process_urls 最大并发数，默认5')
+    parser.add_argument('--tabs', type=int, default=1, help='process_urls 每个浏览器的标签页数量，默认1')
+    parser.add_argument('--llm-latency', type=float, default=0.0, help='LLM 替身的模拟延迟（秒）')
+    parser.add_argument('--no-browser', action='store_true', help='不启动浏览器，直接通过 HTTP 获取原始 HTML')
+    parser.add_argument('--extract-mode', choices=['html', 'dom'], default='html',
+                        help='内容提取方式：html 取回页面源代码后解析，dom 在浏览器内直接提取')
+    parser.add_argument('--check-parity', action='store_true', help='检查 html 与 dom 两种提取方式的结果是否一致')
+    parser.add_argument('-o', '--output', help='结果输出路径，默认保存到 cache/bench 目录')
+    parser.add_argument('--compare', help='用于比较的基线结果文件')
+    parser.add_argument('--threshold', type=float, default=0.2, help='判定为回退的变化比例，默认0.2')
+    args = parser.parse_args()
+
+    output = args.output
+    if output is None:
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        output = os.path.join(ROOT_DIR, 'cache', 'bench', f"{timestamp}.json")
+    output = os.path.abspath(output)
+
+    # 先在原目录完成导入和配置加载（EnvConfig 从当前目录读取 .env），再切换到临时目录运行，
+    # 避免基准测试产生的缓存文件混入正式缓存
+    import tools.search, tools.web_access
+    from lib.env import get_config
+    load_insert_content()
+    get_config()
+    cwd = os.getcwd()
+    with CorpusServer() as server, tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            results = run_benchmark(server.urls(), args)
+        finally:
+            os.chdir(cwd)
+
+    results.update(resource_usage())
+    results.update({
+        'commit': git_commit(),
+        'timestamp': datetime.now().strftime('%Y%m%d_%H%M%S'),
+        'config': vars(args),
+    })
+
+    for stage, stats in results['stages'].items():
+        print(f"{stage}: p50 {stats['p50_ms']} ms, p95 {stats['p95_ms']} ms ({stats['count']} 次)")
+    if results['pages_per_sec']:
+        print(f"pages/sec: {results['pages_per_sec']}")
+    print(f"峰值内存(MB): {results['peak_rss_mb']}")
+    print(f"CPU 时间(秒): {results['cpu_seconds']}")
+
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"\n基准测试结果已保存到: {output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if compare_results(results, baseline, args.threshold):
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
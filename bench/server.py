@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import threading
+import json
+import time
+import os
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus')
+
+def load_manifest(corpus_dir=CORPUS_DIR):
+    """读取语料清单，返回 route -> 页面配置 的字典"""
+    with open(os.path.join(corpus_dir, 'manifest.json'), 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    return {page['route']: page for page in manifest['pages']}
+
+def generate_table(rows):
+    """生成一个超大数据表格页面，用于测试大页面的抓取和解析"""
+    cells = ''.join(
+        f'<tr><td>{i}</td><td>景点{i}</td><td><a href="/spots/{i}.html">详情{i}</a></td>'
+        f'<td><img src="/images/{i}.png" alt="图片{i}"></td></tr>'
+        for i in range(rows)
+    )
+    return (
+        '<!DOCTYPE html><html><head><meta charset="utf-8"><title>数据表格</title></head>'
+        f'<body><table>{cells}</table></body></html>'
+    )
+
+class CorpusRequestHandler(BaseHTTPRequestHandler):
+    """按清单返回语料页面，支持模拟慢速响应"""
+
+    pages = {}
+    corpus_dir = CORPUS_DIR
+
+    def do_GET(self):
+        page = self.pages.get(self.path.split('?')[0])
+        if page is None:
+            # 图片、子页面等资源统一返回空响应，避免浏览器等待
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        if page.get('delay'):
+            time.sleep(page['delay'])
+
+        if page.get('generate') == 'table':
+            body = generate_table(page.get('rows', 1000)).encode('utf-8')
+        else:
+            with open(os.path.join(self.corpus_dir, page['file']), 'rb') as f:
+                body = f.read()
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """静默请求日志，避免干扰基准测试输出"""
+        pass
+
+class CorpusServer:
+    """在本地后台线程中运行的语料 HTTP 服务"""
+
+    def __init__(self, corpus_dir=CORPUS_DIR, host='127.0.0.1', port=0):
+        """
+        初始化语料服务
+
+        Args:
+            corpus_dir: 语料目录，需包含 manifest.json
+            host: 监听地址
+            port: 监听端口，0 表示随机分配
+        """
+        handler = type('Handler', (CorpusRequestHandler,), {
+            'pages': load_manifest(corpus_dir),
+            'corpus_dir': corpus_dir,
+        })
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def urls(self):
+        """返回语料中所有页面的完整URL"""
+        return [self.base_url + route for route in self.httpd.RequestHandlerClass.pages]
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
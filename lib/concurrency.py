@@ -0,0 +1,117 @@
+import threading
+import time
+from collections import deque
+from lib import sysinfo
+
+class AdaptiveConcurrency:
+    """AIMD 并发控制器：运行平稳时逐步加一，出现过载信号时减半"""
+
+    def __init__(self, min_workers=1, max_workers=8, initial=None, window=10,
+                 max_error_rate=0.3, latency_tolerance=2.0,
+                 min_free_memory_mb=512, max_cpu_load=1.5, probe_interval=1.0):
+        """
+        初始化并发控制器
+
+        Args:
+            min_workers: 最小并发数
+            max_workers: 最大并发数
+            initial: 初始并发数，默认取 min_workers 与 max_workers 的中间值
+            window: 统计错误率和延迟的滑动窗口大小
+            max_error_rate: 窗口内错误率超过该值视为过载
+            latency_tolerance: 平均延迟超过历史最低平均延迟的倍数时视为过载
+            min_free_memory_mb: 可用内存低于该值（MB）时视为过载
+            max_cpu_load: 每核负载高于该值时视为过载
+            probe_interval: 读取系统内存和负载的最小间隔（秒）
+        """
+        self.min_workers = max(1, min_workers)
+        self.max_workers = max(self.min_workers, max_workers)
+        if initial is None:
+            initial = (self.min_workers + self.max_workers) // 2
+        self._limit = min(self.max_workers, max(self.min_workers, initial))
+        self.max_error_rate = max_error_rate
+        self.latency_tolerance = latency_tolerance
+        self.min_free_memory_mb = min_free_memory_mb
+        self.max_cpu_load = max_cpu_load
+        self.probe_interval = probe_interval
+
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=window)
+        self._best_latency = None
+        self._successes_since_change = 0
+        self._completions_since_decrease = 0
+        self._last_probe = 0.0
+        self._probe = (None, None)
+
+    @property
+    def limit(self):
+        """当前允许的并发数"""
+        return self._limit
+
+    def _system_pressure(self):
+        """返回内存或 CPU 过载的原因，无过载时返回 None"""
+        now = time.monotonic()
+        if now - self._last_probe >= self.probe_interval:
+            self._probe = (sysinfo.free_memory_mb(), sysinfo.cpu_load())
+            self._last_probe = now
+        free_mb, load = self._probe
+        if free_mb is not None and free_mb < self.min_free_memory_mb:
+            return f"可用内存不足 ({free_mb:.0f}MB)"
+        if load is not None and load > self.max_cpu_load:
+            return f"CPU 负载过高 ({load:.2f})"
+        return None
+
+    def _overload_reason(self):
+        """根据窗口内的错误率、延迟和系统资源判断是否过载"""
+        reason = self._system_pressure()
+        if reason or len(self._samples) < self._samples.maxlen // 2:
+            return reason
+
+        errors = sum(1 for _, ok in self._samples if not ok)
+        error_rate = errors / len(self._samples)
+        if error_rate > self.max_error_rate:
+            return f"错误率过高 ({error_rate:.0%})"
+
+        latencies = [latency for latency, ok in self._samples if ok]
+        if latencies:
+            avg_latency = sum(latencies) / len(latencies)
+            if self._best_latency is None or avg_latency < self._best_latency:
+                self._best_latency = avg_latency
+            elif avg_latency > self._best_latency * self.latency_tolerance:
+                return f"延迟升高 ({avg_latency:.1f}s，最低 {self._best_latency:.1f}s)"
+        return None
+
+    def record(self, latency, ok):
+        """
+        记录一次任务完成情况并调整并发数
+
+        Args:
+            latency: 任务耗时（秒）
+            ok: 任务是否成功
+
+        Returns:
+            int: 调整后的并发数
+        """
+        with self._lock:
+            self._samples.append((latency, ok))
+            self._completions_since_decrease += 1
+            reason = self._overload_reason()
+
+            # 每个窗口最多减半一次，避免同一批在途任务的结果连续触发
+            if reason and self._completions_since_decrease >= self._limit:
+                new_limit = max(self.min_workers, self._limit // 2)
+                if new_limit != self._limit:
+                    print(f"[DEBUG] {reason}，并发数 {self._limit} -> {new_limit}")
+                self._limit = new_limit
+                self._completions_since_decrease = 0
+                self._successes_since_change = 0
+                self._samples.clear()
+            elif not reason and ok:
+                # 窗口内样本足够且连续成功完成一轮（limit 个任务）后并发数加一
+                self._successes_since_change += 1
+                if (self._successes_since_change >= self._limit
+                        and len(self._samples) >= self._samples.maxlen // 2
+                        and self._limit < self.max_workers):
+                    print(f"[DEBUG] 运行平稳，并发数 {self._limit} -> {self._limit + 1}")
+                    self._limit += 1
+                    self._successes_since_change = 0
+            return self._limit
@@ -1,35 +1,31 @@
-from pathlib import Path
-from typing import Optional
-from pydantic import Field, AliasChoices, field_validator
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from functools import lru_cache
 
-class EnvConfig(BaseSettings):
-    # 数据库配置
-    debug: bool = Field(
-        default=False,
-        description="启用调试模式"
-    )
-    log_level: str = Field(
-        default="INFO",
-        pattern="^(DEBUG|INFO|WARNING|ERROR|CRITICAL)$"
-    )
+@lru_cache(maxsize=None)
+def get_config():
+    """
+    获取全局配置实例
 
-    chrome_path: str = Field(
-        default="",
-        description="CHROME 执行路径"
-    )
+    首次调用时才导入 pydantic-settings 并读取 .env，命令行工具在 --help 等
+    不需要配置的路径上不必承担这部分启动开销。
+    """
+    from lib.settings import EnvConfig
+    return EnvConfig()
 
-    model_config = SettingsConfigDict(
-        env_file=".env",
-        env_file_encoding="utf-8",
-        case_sensitive=False,
-        env_prefix="",
-        env_nested_delimiter="__",
-        extra="ignore",
-        validate_default=True,
-        protected_namespaces=("model_", "settings_"),
-        # secrets_dir="secrets"
-    )
+class LazyConfig:
+    """全局配置的延迟代理，访问任意属性时才构建 EnvConfig"""
 
-# 创建全局配置实例
-config = EnvConfig() 
\ No newline at end of file
+    def __getattr__(self, name):
+        return getattr(get_config(), name)
+
+    def __repr__(self):
+        return repr(get_config())
+
+def __getattr__(name):
+    # 兼容 from lib.env import EnvConfig
+    if name == 'EnvConfig':
+        from lib.settings import EnvConfig
+        return EnvConfig
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# 创建全局配置实例（延迟构建）
+config = LazyConfig()
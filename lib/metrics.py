@@ -0,0 +1,210 @@
+import atexit
+import bisect
+import json
+import math
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+from typing import Callable, Any
+
+# Prometheus 直方图桶边界（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+# 每个直方图保留的样本数和 trace 事件数上限，避免长时间运行时内存增长
+MAX_SAMPLES = 1000
+MAX_TRACE_EVENTS = 100000
+
+class Histogram:
+    """耗时直方图，同时保留最近的样本用于计算分位数"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+        self.samples = []
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            self.bucket_counts[index] += 1
+        if len(self.samples) >= MAX_SAMPLES:
+            self.samples.pop(0)
+        self.samples.append(value)
+
+    def percentile(self, pct):
+        ordered = sorted(self.samples)
+        if not ordered:
+            return None
+        return ordered[max(0, math.ceil(len(ordered) * pct / 100) - 1)]
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'min': self.min,
+            'max': self.max,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+        }
+
+class Metrics:
+    """轻量级指标收集器：计时器、计数器和直方图，可导出为 JSON、Prometheus 文本或 Chrome trace"""
+
+    def __init__(self, enabled=None):
+        """
+        初始化指标收集器
+
+        Args:
+            enabled: 是否启用，None 表示首次使用时根据 EnvConfig.metrics_enabled 决定
+        """
+        self._enabled = enabled
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+        self.counters = {}
+        self.histograms = {}
+        self.trace_events = []
+
+    @property
+    def enabled(self):
+        if self._enabled is None:
+            from lib.env import config
+            with self._lock:
+                if self._enabled is None:
+                    self._enabled = config.metrics_enabled
+                    if self._enabled:
+                        atexit.register(self.export)
+        return self._enabled
+
+    def incr(self, name, value=1):
+        """计数器累加"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name, value):
+        """记录一个直方图样本"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.histograms.setdefault(name, Histogram()).observe(value)
+
+    @contextmanager
+    def timer(self, name, **args):
+        """
+        计时上下文管理器，耗时记录到同名直方图并生成一个 trace 事件
+
+        Args:
+            name: 指标名称
+            **args: 附加到 trace 事件的参数，例如 url
+        """
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.observe(name, end - start)
+            with self._lock:
+                if len(self.trace_events) < MAX_TRACE_EVENTS:
+                    self.trace_events.append({
+                        'name': name,
+                        'ph': 'X',
+                        'ts': round((start - self._start) * 1e6, 1),
+                        'dur': round((end - start) * 1e6, 1),
+                        'pid': os.getpid(),
+                        'tid': threading.get_ident(),
+                        'args': args,
+                    })
+
+    def timed(self, name):
+        """计时装饰器"""
+        def decorator(func: Callable) -> Callable:
+            @wraps(func)
+            def wrapper(*args, **kwargs) -> Any:
+                with self.timer(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def summary(self):
+        """返回 JSON 格式的汇总"""
+        with self._lock:
+            return {
+                'counters': dict(self.counters),
+                'timers': {name: h.summary() for name, h in self.histograms.items()},
+            }
+
+    def to_prometheus(self):
+        """导出为 Prometheus 文本格式"""
+        lines = []
+        with self._lock:
+            for name, value in sorted(self.counters.items()):
+                lines.append(f"# TYPE {name}_total counter")
+                lines.append(f"{name}_total {value}")
+            for name, h in sorted(self.histograms.items()):
+                metric = f"{name}_seconds"
+                lines.append(f"# TYPE {metric} histogram")
+                cumulative = 0
+                for bound, count in zip(h.buckets, h.bucket_counts):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{le="+Inf"}} {h.count}')
+                lines.append(f"{metric}_sum {h.sum}")
+                lines.append(f"{metric}_count {h.count}")
+        return '\n'.join(lines) + '\n'
+
+    def to_trace(self):
+        """导出为 Chrome trace-event 格式，可在 chrome://tracing 或 Perfetto 中打开"""
+        with self._lock:
+            return {'traceEvents': list(self.trace_events), 'displayTimeUnit': 'ms'}
+
+    def export(self, fmt=None, output_dir=None):
+        """
+        将指标写入文件
+
+        Args:
+            fmt: 导出格式 json/prometheus/trace，默认使用 EnvConfig.metrics_format
+            output_dir: 输出目录，默认使用 EnvConfig.metrics_dir
+
+        Returns:
+            str: 保存的文件路径，未启用或没有数据时返回 None
+        """
+        if not self._enabled or not (self.counters or self.histograms):
+            return None
+        if fmt is None or output_dir is None:
+            from lib.env import config
+            fmt = fmt or config.metrics_format
+            output_dir = output_dir or config.metrics_dir
+        os.makedirs(output_dir, exist_ok=True)
+
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        if fmt == 'prometheus':
+            filepath = os.path.join(output_dir, f"{timestamp}_{os.getpid()}.prom")
+            content = self.to_prometheus()
+        else:
+            data = self.to_trace() if fmt == 'trace' else self.summary()
+            suffix = 'trace.json' if fmt == 'trace' else 'json'
+            filepath = os.path.join(output_dir, f"{timestamp}_{os.getpid()}.{suffix}")
+            content = json.dumps(data, ensure_ascii=False, indent=2)
+
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write(content)
+        # 输出到 stderr，避免干扰 Agent 从 stdout 读取结果文件名
+        print(f"Metrics saved to: {filepath}", file=sys.stderr)
+        return filepath
+
+# 全局指标收集器
+metrics = Metrics()
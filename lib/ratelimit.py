@@ -0,0 +1,54 @@
+import threading
+import time
+from lib.metrics import metrics
+
+class RateLimiter:
+    """令牌桶限速器，多个线程共享同一个外部服务的请求速率"""
+
+    def __init__(self, rate, burst=1):
+        """
+        初始化限速器
+
+        Args:
+            rate: 每秒允许的请求数
+            burst: 允许的突发请求数
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """取得一个令牌，令牌不足时阻塞等待"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            metrics.observe('rate_limit_wait', wait)
+            time.sleep(wait)
+
+_limiters = {}
+
+def configure(name, rate, burst=1):
+    """
+    为端点设置全局请求速率，rate 为 0 或 None 时取消限速
+
+    端点名称与 lib.retry 的 endpoint 一致（例如 duckduckgo、llm、tencent_map），
+    经过 retry_call 的每次尝试都会先取得令牌。
+    """
+    if rate:
+        _limiters[name] = RateLimiter(rate, burst)
+    else:
+        _limiters.pop(name, None)
+
+def acquire(name):
+    """按端点限速，未设置限速的端点立即返回"""
+    limiter = _limiters.get(name)
+    if limiter is not None:
+        limiter.acquire()
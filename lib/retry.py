@@ -0,0 +1,254 @@
+import random
+import re
+import threading
+import time
+from functools import wraps
+from urllib.parse import urlparse
+from lib.metrics import metrics
+from lib import ratelimit
+
+# 错误分类
+RETRYABLE = 'retryable'
+RATE_LIMITED = 'rate_limited'
+FATAL = 'fatal'
+
+# 重试也无法恢复的异常类型：参数、数据或程序错误
+FATAL_EXCEPTIONS = (
+    ValueError, TypeError, KeyError, IndexError, AttributeError,
+    NotImplementedError, AssertionError, FileNotFoundError, PermissionError,
+)
+# 异常信息匹配即视为限流；429 只按独立的数字匹配，避免命中 4290.jpg、1429 ms 等
+RATE_LIMIT_PATTERN = re.compile(r'rate ?limit|too many requests|\b429\b')
+# 出现在异常信息中即视为不可恢复：域名解析失败、证书错误、地址无效等
+FATAL_MARKERS = (
+    'err_name_not_resolved', 'err_cert_', 'err_ssl_', 'err_invalid_url',
+    'err_unsafe_port', 'err_blocked_by_client', 'invalid argument',
+)
+
+class RetryableError(Exception):
+    """调用方明确标记为可重试的错误"""
+
+class FatalError(Exception):
+    """调用方明确标记为不可重试的错误"""
+
+class CircuitOpenError(Exception):
+    """熔断器处于打开状态，请求未发出即失败"""
+
+def _status_code(exc):
+    """从 HTTP 客户端异常中取出状态码，取不到时返回 None"""
+    for obj in (exc, getattr(exc, 'response', None)):
+        for attr in ('status_code', 'status', 'code'):
+            value = getattr(obj, attr, None)
+            if isinstance(value, int):
+                return value
+    return None
+
+def classify(exc):
+    """
+    判断异常是否值得重试
+
+    Args:
+        exc: 捕获到的异常
+
+    Returns:
+        str: RETRYABLE / RATE_LIMITED / FATAL
+    """
+    if isinstance(exc, (FatalError, CircuitOpenError)):
+        return FATAL
+    if isinstance(exc, RetryableError):
+        return RETRYABLE
+
+    status = _status_code(exc)
+    if status == 429:
+        return RATE_LIMITED
+    if status is not None and 400 <= status < 500 and status != 408:
+        return FATAL
+
+    message = str(exc).lower()
+    if RATE_LIMIT_PATTERN.search(message):
+        return RATE_LIMITED
+    if any(marker in message for marker in FATAL_MARKERS):
+        return FATAL
+    if isinstance(exc, FATAL_EXCEPTIONS):
+        return FATAL
+    # 超时、连接错误、5xx 以及其他未知错误均视为暂时性故障
+    return RETRYABLE
+
+class CircuitBreaker:
+    """
+    单个端点的熔断器
+
+    连续失败达到阈值后打开，在冷却时间内直接拒绝请求；冷却结束后放行一个探测请求（半开），
+    探测成功则关闭，失败则重新打开。
+    """
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self.opened_at is None:
+                return 'closed'
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                return 'half_open'
+            return 'open'
+
+    def allow(self):
+        """是否允许发出请求；半开状态下只放行一个探测请求"""
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.reset_timeout or self.probing:
+                return False
+            self.probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            # 已熔断过（包括冷却结束后的半开状态）的端点再次失败时立即重新熔断，
+            # 无论失败来自 allow() 放行的探测请求，还是 record_outcome 上报的自行调度请求
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                now = time.monotonic()
+                # 熔断期间仍在进行中的请求失败只延长冷却时间，不重复输出
+                if self.opened_at is None or now - self.opened_at >= self.reset_timeout:
+                    print(f"[DEBUG] 端点 {self.name} 连续失败 {self.failures} 次，熔断 {self.reset_timeout} 秒")
+                    metrics.incr('circuit_opened')
+                self.opened_at = now
+                self.probing = False
+
+class RetryBudget:
+    """
+    全局重试预算，限制重试请求在总请求中的比例
+
+    每个首次请求存入 ratio 个令牌，每次重试消耗一个令牌，令牌不足时不再重试，
+    避免下游大面积故障时所有工作线程都在重试中空转。
+    """
+
+    def __init__(self, ratio=0.2, max_tokens=10):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self):
+        with self._lock:
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+# 进程内所有重试共享的预算
+budget = RetryBudget()
+
+def get_breaker(endpoint, failure_threshold=5, reset_timeout=30):
+    """获取端点对应的熔断器，不存在时创建"""
+    with _breakers_lock:
+        if endpoint not in _breakers:
+            _breakers[endpoint] = CircuitBreaker(endpoint, failure_threshold, reset_timeout)
+        return _breakers[endpoint]
+
+def endpoint_for_url(url):
+    """按域名划分网页抓取的端点"""
+    return f"web:{(urlparse(url).hostname or '').lower()}"
+
+def record_outcome(endpoint, error=None):
+    """
+    记录一次未经 retry_call 的请求结果，供多标签页抓取、爬虫等自行调度请求的路径更新熔断状态
+
+    Args:
+        endpoint: 端点名称
+        error: 请求失败时的异常，成功时为 None
+    """
+    breaker = get_breaker(endpoint)
+    if error is None or classify(error) == FATAL:
+        breaker.record_success()
+    else:
+        breaker.record_failure()
+
+def retry_call(func, *args, endpoint=None, max_attempts=3, base_delay=1, max_delay=30,
+               rate_limit_delay=None, use_budget=True, **kwargs):
+    """
+    调用函数，失败时按错误类型决定是否重试
+
+    重试间隔使用 decorrelated jitter：sleep = min(max_delay, uniform(base_delay, 上次间隔 * 3))。
+    限流错误的间隔不小于 rate_limit_delay（默认 base_delay 的 4 倍）。
+
+    Args:
+        func: 要调用的函数，其余位置参数和关键字参数原样传入
+        endpoint: 端点名称，用于熔断、限速（见 lib.ratelimit）和日志，为 None 时不启用熔断和限速
+        max_attempts: 最多尝试次数（含首次）
+        base_delay: 最小重试间隔（秒）
+        max_delay: 最大重试间隔（秒）
+        rate_limit_delay: 限流时的最小重试间隔（秒）
+        use_budget: 是否受全局重试预算限制
+
+    Returns:
+        函数返回值；最后一次失败的异常会原样抛出
+    """
+    breaker = get_breaker(endpoint) if endpoint else None
+    rate_limit_delay = base_delay * 4 if rate_limit_delay is None else rate_limit_delay
+    label = endpoint or getattr(func, '__qualname__', 'call')
+    delay = base_delay
+    budget.deposit()
+
+    for attempt in range(1, max_attempts + 1):
+        if breaker and not breaker.allow():
+            metrics.incr('circuit_rejected')
+            raise CircuitOpenError(f"端点 {endpoint} 已熔断，跳过请求")
+        if endpoint:
+            ratelimit.acquire(endpoint)
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            kind = classify(e)
+            # 只有暂时性故障才计入熔断；参数错误、4xx 等说明端点本身可以访问
+            if breaker:
+                breaker.record_success() if kind == FATAL else breaker.record_failure()
+            # 本次失败触发熔断时不再等待重试
+            if kind == FATAL or attempt == max_attempts or (breaker and breaker.state == 'open'):
+                raise
+            if use_budget and not budget.withdraw():
+                metrics.incr('retry_budget_exhausted')
+                print(f"[DEBUG] 重试预算已耗尽，{label} 不再重试")
+                raise
+
+            delay = min(max_delay, random.uniform(base_delay, delay * 3))
+            if kind == RATE_LIMITED:
+                delay = max(delay, rate_limit_delay)
+                metrics.incr('retry_rate_limited')
+            metrics.incr('retry_attempts')
+            print(f"[DEBUG] {label} 失败（{kind}）: {str(e)}，{delay:.1f} 秒后进行第 {attempt + 1}/{max_attempts} 次尝试")
+            time.sleep(delay)
+        else:
+            if breaker:
+                breaker.record_success()
+            return result
+
+def retrying(endpoint=None, **options):
+    """retry_call 的装饰器形式，参数同 retry_call"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            return retry_call(func, *args, endpoint=endpoint, **options, **kwargs)
+        return wrapper
+    return decorator
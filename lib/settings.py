@@ -0,0 +1,151 @@
+from pathlib import Path
+from typing import Optional
+from pydantic import Field, AliasChoices, field_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+class EnvConfig(BaseSettings):
+    # 数据库配置
+    debug: bool = Field(
+        default=False,
+        description="启用调试模式"
+    )
+    log_level: str = Field(
+        default="INFO",
+        pattern="^(DEBUG|INFO|WARNING|ERROR|CRITICAL)$"
+    )
+
+    chrome_path: str = Field(
+        default="",
+        description="CHROME 执行路径"
+    )
+
+    # 自适应并发配置
+    adaptive_workers: bool = Field(
+        default=False,
+        description="根据页面延迟、错误率、可用内存和 CPU 负载自动调整浏览器并发数"
+    )
+    min_workers: int = Field(
+        default=1,
+        ge=1,
+        description="自适应并发的最小浏览器数"
+    )
+    max_workers: int = Field(
+        default=8,
+        ge=1,
+        description="自适应并发的最大浏览器数"
+    )
+    min_free_memory_mb: int = Field(
+        default=512,
+        ge=0,
+        description="可用内存低于该值（MB）时减少并发"
+    )
+
+    extract_mode: str = Field(
+        default="html",
+        pattern="^(html|dom)$",
+        description="内容提取方式：html 取回页面源代码后解析，dom 在浏览器内直接提取"
+    )
+
+    tabs_per_browser: int = Field(
+        default=1,
+        ge=1,
+        description="每个浏览器同时加载的标签页数量，大于1时启用多标签页模式"
+    )
+
+    # 页面大小与内存限制（0 表示不限制）
+    max_html_chars: int = Field(
+        default=5_000_000,
+        ge=0,
+        description="从浏览器取回的 HTML 最大字符数，超出部分在浏览器内截断"
+    )
+    max_text_chars: int = Field(
+        default=200_000,
+        ge=0,
+        description="每个页面提取的正文最大字符数"
+    )
+    max_links: int = Field(
+        default=500,
+        ge=0,
+        description="每个页面提取的最大链接数"
+    )
+    max_images: int = Field(
+        default=200,
+        ge=0,
+        description="每个页面提取的最大图片数"
+    )
+    max_browser_rss_mb: int = Field(
+        default=1500,
+        ge=0,
+        description="单个浏览器（含子进程）的内存上限（MB），超出后回收并重启浏览器"
+    )
+
+    # 指标配置，默认关闭：每次运行都会写入一个指标文件
+    metrics_enabled: bool = Field(
+        default=False,
+        description="是否收集指标并在进程退出时写入 metrics_dir"
+    )
+    metrics_format: str = Field(
+        default="json",
+        pattern="^(json|prometheus|trace)$",
+        description="指标导出格式：json 汇总、prometheus 文本或 chrome trace"
+    )
+    metrics_dir: str = Field(
+        default="cache/metrics",
+        description="指标文件输出目录"
+    )
+
+    image_probe: bool = Field(
+        default=True,
+        description="挑选图片时是否发起 Range 请求探测图片类型、大小和宽高"
+    )
+
+    # 缓存存储（cache/url_results 和 cache/search_results）
+    cache_format: str = Field(
+        default="json",
+        pattern="^(json|gzip|zstd)$",
+        description="缓存文件格式：json 为可直接阅读的 JSON，gzip/zstd 为压缩的 NDJSON"
+    )
+    cache_max_age_days: int = Field(
+        default=0,
+        ge=0,
+        description="缓存文件最长保留天数，0 表示不限制"
+    )
+    cache_max_mb: int = Field(
+        default=0,
+        ge=0,
+        description="每个缓存目录的总大小上限（MB），超出时从最旧的文件开始删除，0 表示不限制"
+    )
+
+    # 本地常驻服务（python3 -m tools.daemon start）
+    daemon_host: str = Field(
+        default="127.0.0.1",
+        description="常驻服务监听地址"
+    )
+    daemon_port: int = Field(
+        default=8765,
+        ge=0,
+        le=65535,
+        description="常驻服务监听端口，0 表示随机端口"
+    )
+    daemon_browsers: int = Field(
+        default=3,
+        ge=1,
+        description="常驻服务预热的浏览器数量"
+    )
+    daemon_cache_ttl: int = Field(
+        default=3600,
+        ge=0,
+        description="常驻服务内存中搜索结果和页面内容的缓存时间（秒）"
+    )
+
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        case_sensitive=False,
+        env_prefix="",
+        env_nested_delimiter="__",
+        extra="ignore",
+        validate_default=True,
+        protected_namespaces=("model_", "settings_"),
+        # secrets_dir="secrets"
+    )
@@ -0,0 +1,219 @@
+import gzip
+import json
+import os
+import time
+
+# 缓存格式与文件后缀：json 为原有的格式化 JSON（Agent 可直接读取），gzip / zstd 为压缩的 NDJSON
+FORMAT_SUFFIXES = {
+    'json': '.json',
+    'gzip': '.ndjson.gz',
+    'zstd': '.ndjson.zst',
+}
+
+def _load_zstd():
+    """延迟导入 zstandard，未安装时给出提示"""
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("使用 zstd 缓存格式需要先安装 zstandard：pip install zstandard")
+    return zstandard
+
+def detect_format(path):
+    """根据文件后缀判断缓存格式，不支持的文件返回 None"""
+    for fmt, suffix in FORMAT_SUFFIXES.items():
+        if path.endswith(suffix):
+            return fmt
+    return None
+
+def base_name(path):
+    """去掉目录和格式后缀的文件名，同一次运行的结果转换格式后保持不变"""
+    name = os.path.basename(path)
+    fmt = detect_format(name)
+    return name[:-len(FORMAT_SUFFIXES[fmt])] if fmt else name
+
+def _open_text(path, mode):
+    """以文本方式打开缓存文件，按后缀自动处理压缩"""
+    fmt = detect_format(path)
+    if fmt == 'gzip':
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    if fmt == 'zstd':
+        zstandard = _load_zstd()
+        return zstandard.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+def write_records(directory, name, header, records, fmt='json'):
+    """
+    保存一次运行的结果
+
+    json 格式写入 {**header, 'results': records} 的格式化 JSON；
+    压缩格式第一行写入 header，之后每行一条记录，读取时可以逐条加载。
+
+    Args:
+        directory: 输出目录
+        name: 不含后缀的文件名
+        header: 文件头信息，例如时间戳、查询词
+        records: 结果记录列表
+        fmt: 缓存格式 json/gzip/zstd
+
+    Returns:
+        str: 保存的文件路径
+    """
+    if fmt not in FORMAT_SUFFIXES:
+        raise ValueError(f"不支持的缓存格式: {fmt}")
+    os.makedirs(directory, exist_ok=True)
+    # 文件名精确到秒，并发写入时以独占方式创建文件，重名则追加序号，避免互相覆盖
+    suffix = FORMAT_SUFFIXES[fmt]
+    filepath = os.path.join(directory, name + suffix)
+    index = 1
+    while True:
+        try:
+            os.close(os.open(filepath, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            break
+        except FileExistsError:
+            filepath = os.path.join(directory, f"{name}_{index}{suffix}")
+            index += 1
+
+    with _open_text(filepath, 'w') as f:
+        if fmt == 'json':
+            json.dump({**header, 'results': records}, f, ensure_ascii=False, indent=2)
+        else:
+            f.write(json.dumps(header, ensure_ascii=False) + '\n')
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    return filepath
+
+class RecordStream:
+    """压缩文件中结果记录的惰性视图，每次迭代重新打开文件，逐条解析"""
+
+    def __init__(self, path, total=None):
+        self.path = path
+        self.total = total
+
+    def __iter__(self):
+        with _open_text(self.path, 'r') as f:
+            f.readline()  # 跳过文件头
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def __len__(self):
+        if self.total is None:
+            self.total = sum(1 for _ in self)
+        return self.total
+
+    def __getitem__(self, index):
+        # 切片和下标会加载全部记录，仅为兼容按列表使用结果的调用方
+        return list(self)[index]
+
+def read_records(path):
+    """
+    读取一次运行的结果
+
+    Args:
+        path: 缓存文件路径，支持 json/gzip/zstd 三种格式
+
+    Returns:
+        dict: 文件头信息加上 'results'；压缩格式的 'results' 为 RecordStream，遍历时逐条加载
+    """
+    if detect_format(path) in (None, 'json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    with _open_text(path, 'r') as f:
+        header = json.loads(f.readline())
+    return {**header, 'results': RecordStream(path, total=header.get('total_urls'))}
+
+def list_files(directory):
+    """列出目录下所有受支持格式的缓存文件"""
+    if not os.path.isdir(directory):
+        return []
+    return [
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if detect_format(name) and os.path.isfile(os.path.join(directory, name))
+    ]
+
+def find_latest(directory):
+    """返回目录下最新的缓存文件，没有文件时返回 None"""
+    files = list_files(directory)
+    # 使用修改时间而不是 ctime：压缩转换后的文件保留了原文件的修改时间
+    return max(files, key=os.path.getmtime) if files else None
+
+def apply_retention(directory, max_age_days=0, max_mb=0, keep=None):
+    """
+    按保留策略清理缓存目录：先删除超过保留天数的文件，再从最旧的文件开始删除直到总大小不超过上限
+
+    Args:
+        directory: 缓存目录
+        max_age_days: 最长保留天数，0 表示不限制
+        max_mb: 目录总大小上限（MB），0 表示不限制
+        keep: 不删除的文件路径，通常是刚写入的文件
+
+    Returns:
+        list: 被删除的文件路径
+    """
+    if not max_age_days and not max_mb:
+        return []
+
+    # 多个线程或进程可能同时清理同一目录，其他调用方已删除的文件直接跳过
+    stats = {}
+    for path in list_files(directory):
+        try:
+            stats[path] = os.stat(path)
+        except FileNotFoundError:
+            continue
+    files = sorted(stats, key=lambda p: stats[p].st_mtime)
+    keep = os.path.abspath(keep) if keep else None
+    removed = []
+
+    def remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            return
+        removed.append(path)
+
+    if max_age_days:
+        cutoff = time.time() - max_age_days * 86400
+        for path in [p for p in files if stats[p].st_mtime < cutoff and os.path.abspath(p) != keep]:
+            remove(path)
+            files.remove(path)
+
+    if max_mb:
+        total = sum(stats[p].st_size for p in files)
+        for path in list(files):
+            if total <= max_mb * 1024 * 1024:
+                break
+            if os.path.abspath(path) == keep:
+                continue
+            total -= stats[path].st_size
+            remove(path)
+
+    return removed
+
+def compact(directory, fmt='gzip'):
+    """
+    将目录下其他格式的缓存文件转换为指定格式，保留原文件的修改时间
+
+    Args:
+        directory: 缓存目录
+        fmt: 目标格式 json/gzip/zstd
+
+    Returns:
+        tuple: (转换的文件数, 转换前总字节数, 转换后总字节数)
+    """
+    converted, before, after = 0, 0, 0
+    for path in list_files(directory):
+        if detect_format(path) == fmt:
+            continue
+
+        data = read_records(path)
+        records = list(data.pop('results', []))
+        stat = os.stat(path)
+        new_path = write_records(directory, base_name(path), data, records, fmt)
+        os.utime(new_path, (stat.st_atime, stat.st_mtime))
+
+        before += stat.st_size
+        after += os.path.getsize(new_path)
+        os.remove(path)
+        converted += 1
+    return converted, before, after
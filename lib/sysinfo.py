@@ -0,0 +1,69 @@
+import os
+import subprocess
+
+def free_memory_mb():
+    """
+    获取系统可用内存
+
+    Returns:
+        float: 可用内存（MB），无法获取时返回 None
+    """
+    try:
+        with open('/proc/meminfo', 'r') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+    except (ValueError, OSError, AttributeError):
+        return None
+
+def cpu_load():
+    """
+    获取每个 CPU 核心的平均负载（1分钟）
+
+    Returns:
+        float: 负载 / 核心数，无法获取时返回 None
+    """
+    try:
+        return os.getloadavg()[0] / (os.cpu_count() or 1)
+    except (OSError, AttributeError):
+        return None
+
+def process_tree_rss_mb(pid):
+    """
+    获取进程及其所有子孙进程的常驻内存总和（浏览器驱动会派生多个 Chrome 进程）
+
+    Args:
+        pid: 根进程 ID
+
+    Returns:
+        float: 内存总和（MB），无法获取时返回 None
+    """
+    try:
+        output = subprocess.run(['ps', '-A', '-o', 'pid=,ppid=,rss='],
+                                capture_output=True, text=True, timeout=5).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+    children = {}
+    rss = {}
+    for line in output.splitlines():
+        parts = line.split()
+        if len(parts) != 3:
+            continue
+        child, parent, size = (int(p) for p in parts)
+        children.setdefault(parent, []).append(child)
+        rss[child] = size
+    if pid not in rss:
+        return None
+
+    total = 0
+    stack = [pid]
+    while stack:
+        current = stack.pop()
+        total += rss.get(current, 0)
+        stack.extend(children.get(current, []))
+    return total / 1024
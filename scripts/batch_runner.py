@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+import argparse
+import concurrent.futures
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any
+
+# 将导入路径调整到上层目录
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lib import ratelimit
+from lib.metrics import metrics
+from lib.retry import retry_call
+
+# 每条景点记录的处理流程：地址校验 -> 获取坐标 -> 生成介绍内容
+STAGES = ['verify', 'geocode', 'content']
+STAGE_DEPENDENCIES = {
+    'verify': [],
+    'geocode': ['verify'],
+    'content': ['geocode'],
+}
+DEFAULT_MAP_KEY = "ZIEBZ-RF5RL-N3XPI-MX6MU-HINTO-LJFEX"
+
+class CityFile:
+    """一个城市的景点文件及其处理进度，修改后立即写回，保证中断后可以继续"""
+
+    def __init__(self, path: str, state_dir: str):
+        self.path = path
+        self.state_path = os.path.join(state_dir, os.path.basename(path) + '.progress.json')
+        self.lock = threading.Lock()
+        with open(path, 'r', encoding='utf-8') as f:
+            self.data = json.load(f)
+        self.city = self.data.get('city', '')
+        if not self.city or not isinstance(self.data.get('attractions'), list):
+            raise ValueError(f"{path} 中缺少 'city' 或 'attractions' 字段")
+        # 进度按景点名称记录已完成的阶段
+        self.progress = {}
+        if os.path.exists(self.state_path):
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                self.progress = json.load(f)
+        self._verifier = None
+
+    @property
+    def attractions(self) -> List[Dict[str, Any]]:
+        return self.data['attractions']
+
+    def verifier(self):
+        """每个城市共用一个地址校验器"""
+        with self.lock:
+            if self._verifier is None:
+                from scripts.verify_address import LocationVerifier
+                self._verifier = LocationVerifier(self.path)
+            return self._verifier
+
+    def is_done(self, name: str, stage: str) -> bool:
+        return stage in self.progress.get(name, [])
+
+    def complete(self, index: int, stage: str, updates: Dict[str, Any]):
+        """写入一个阶段的结果并记录进度，文件先写临时文件再替换，避免中断时损坏"""
+        with self.lock:
+            self.attractions[index].update(updates)
+            name = self.attractions[index]['name']
+            self.progress.setdefault(name, []).append(stage)
+            _write_json(self.path, self.data, indent=2)
+            _write_json(self.state_path, self.progress)
+
+def _write_json(path: str, data: Any, indent=None):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=indent)
+    os.replace(tmp_path, path)
+
+class Progress:
+    """汇总各阶段的完成情况，定期输出进度和预计剩余时间"""
+
+    def __init__(self, total: int, interval: float = 5.0):
+        self.total = total
+        self.interval = interval
+        self.counts = {stage: {'done': 0, 'failed': 0, 'skipped': 0} for stage in STAGES}
+        self.start = time.monotonic()
+        self.last_report = 0.0
+
+    @property
+    def finished(self) -> int:
+        return sum(sum(c.values()) for c in self.counts.values())
+
+    def record(self, stage: str, status: str):
+        self.counts[stage][status] += 1
+        metrics.incr(f"batch_{stage}_{status}")
+        now = time.monotonic()
+        if now - self.last_report >= self.interval or self.finished == self.total:
+            self.last_report = now
+            self.report()
+
+    def report(self):
+        elapsed = time.monotonic() - self.start
+        finished = self.finished
+        eta = elapsed / finished * (self.total - finished) if finished else 0
+        stages = '，'.join(f"{stage} {c['done']}/{c['failed']}/{c['skipped']}" for stage, c in self.counts.items())
+        print(f"[进度] {finished}/{self.total} 个任务，已用 {elapsed:.0f}s，预计剩余 {eta:.0f}s"
+              f"（完成/失败/跳过：{stages}）", flush=True)
+
+def run_verify(city_file: CityFile, attraction: Dict[str, Any], options) -> Dict[str, Any]:
+    if not attraction.get('location'):
+        return {}
+    location = city_file.verifier().verify_location(attraction['name'], attraction['location'])
+    return {'location': location.strip()} if location and location.strip() else {}
+
+def run_geocode(city_file: CityFile, attraction: Dict[str, Any], options) -> Dict[str, Any]:
+    from tools.tencent_map import get_coordinate
+
+    if not attraction.get('location') or attraction.get('coordinate'):
+        return {}
+    with metrics.timer('geocode', name=attraction['name']):
+        coordinates = retry_call(get_coordinate, attraction['location'], options.key,
+                                 endpoint='tencent_map', max_attempts=3)
+    if not coordinates:
+        raise RuntimeError(f"无法获取坐标: {attraction['location']}")
+    return {'coordinate': {'longitude': coordinates[0], 'latitude': coordinates[1]}}
+
+def run_content(city_file: CityFile, attraction: Dict[str, Any], options) -> Dict[str, Any]:
+    from scripts.insert_content import process_spot
+
+    if attraction.get('content'):
+        return {}
+    with metrics.timer('process_spot', spot=attraction['name']):
+        return {'content': process_spot(attraction['name'], options.llm_client, speculative=options.speculative)}
+
+STAGE_RUNNERS = {
+    'verify': run_verify,
+    'geocode': run_geocode,
+    'content': run_content,
+}
+
+def build_tasks(city_files: List[CityFile], stages: List[str]):
+    """
+    为每条景点记录生成各阶段任务
+
+    Returns:
+        tuple: (任务列表, 已完成的 (文件序号, 记录序号, 阶段) 集合)；未选中的阶段和进度文件中已完成的阶段视为完成
+    """
+    tasks = []
+    done = set()
+    for file_index, city_file in enumerate(city_files):
+        for index, attraction in enumerate(city_file.attractions):
+            if not attraction.get('name'):
+                continue
+            for stage in STAGES:
+                key = (file_index, index, stage)
+                if stage not in stages or city_file.is_done(attraction['name'], stage):
+                    done.add(key)
+                else:
+                    tasks.append(key)
+    return tasks, done
+
+def run_batch(city_files: List[CityFile], stages: List[str], options) -> Progress:
+    """
+    在共享线程池中按依赖关系调度所有城市的任务
+
+    同一条记录的阶段按 STAGE_DEPENDENCIES 顺序执行，不同记录、不同城市之间并行；
+    每个阶段同时运行的任务数受 options.stage_limits 限制（例如内容生成会启动浏览器）。
+    """
+    tasks, done = build_tasks(city_files, stages)
+    progress = Progress(len(tasks))
+    print(f"共 {len(city_files)} 个城市文件，{len(tasks)} 个待处理任务")
+    if not tasks:
+        return progress
+
+    pending = deque(tasks)
+    failed = set()
+    running = {}
+    stage_running = {stage: 0 for stage in STAGES}
+
+    def execute(key):
+        file_index, index, stage = key
+        city_file = city_files[file_index]
+        updates = STAGE_RUNNERS[stage](city_file, city_file.attractions[index], options)
+        city_file.complete(index, stage, updates)
+
+    with ThreadPoolExecutor(max_workers=options.workers) as executor:
+        while pending or running:
+            # 依赖已完成且所在阶段未达到并发上限的任务才提交；依赖失败的任务跳过
+            for _ in range(len(pending)):
+                key = pending.popleft()
+                file_index, index, stage = key
+                deps = [(file_index, index, dep) for dep in STAGE_DEPENDENCIES[stage]]
+                if any(dep in failed for dep in deps):
+                    failed.add(key)
+                    progress.record(stage, 'skipped')
+                elif (all(dep in done for dep in deps) and len(running) < options.workers
+                      and stage_running[stage] < options.stage_limits[stage]):
+                    running[executor.submit(execute, key)] = key
+                    stage_running[stage] += 1
+                else:
+                    pending.append(key)
+
+            if not running:
+                break
+            finished, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in finished:
+                key = running.pop(future)
+                file_index, index, stage = key
+                stage_running[stage] -= 1
+                try:
+                    future.result()
+                    done.add(key)
+                    progress.record(stage, 'done')
+                except Exception as e:
+                    failed.add(key)
+                    progress.record(stage, 'failed')
+                    name = city_files[file_index].attractions[index]['name']
+                    print(f"[ERROR] {city_files[file_index].city} {name} {stage} 失败: {str(e)}")
+
+    return progress
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='批量处理多个城市的景点文件：地址校验 -> 获取坐标 -> 生成介绍内容，支持中断后继续')
+    parser.add_argument('input_dir', help='城市景点 JSON 文件所在目录（格式同 verify_address.py 的输入）')
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES, help='要执行的阶段，默认全部')
+    parser.add_argument('--workers', type=int, default=8, help='共享线程池大小，默认8')
+    parser.add_argument('--content-workers', type=int, default=2,
+                        help='同时生成内容的记录数（每条记录会启动浏览器），默认2')
+    parser.add_argument('--llm-rps', type=float, default=2, help='LLM 每秒请求数上限，默认2，0 表示不限制')
+    parser.add_argument('--search-rps', type=float, default=0.5, help='DuckDuckGo 每秒请求数上限，默认0.5')
+    parser.add_argument('--geocode-rps', type=float, default=1, help='腾讯地图每秒请求数上限，默认1')
+    parser.add_argument('-k', '--key', default=DEFAULT_MAP_KEY, help='腾讯地图 API key')
+    parser.add_argument('--state-dir', default='cache/batch', help='进度文件目录，默认 cache/batch')
+    parser.add_argument('--restart', action='store_true', help='忽略已有进度，重新处理所有记录')
+    parser.add_argument('--no-speculative', action='store_true', help='生成内容时关闭推测性预取')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.input_dir):
+        print(f"错误：目录 {args.input_dir} 不存在")
+        sys.exit(1)
+    os.makedirs(args.state_dir, exist_ok=True)
+
+    ratelimit.configure('llm', args.llm_rps)
+    ratelimit.configure('duckduckgo', args.search_rps)
+    ratelimit.configure('tencent_map', args.geocode_rps)
+
+    paths = sorted(os.path.join(args.input_dir, name) for name in os.listdir(args.input_dir) if name.endswith('.json'))
+    city_files = []
+    for path in paths:
+        try:
+            city_file = CityFile(path, args.state_dir)
+        except ValueError as e:
+            print(f"跳过 {path}: {str(e)}")
+            continue
+        if args.restart:
+            city_file.progress = {}
+        city_files.append(city_file)
+
+    args.stage_limits = {'verify': args.workers, 'geocode': args.workers, 'content': max(1, args.content_workers)}
+    args.speculative = not args.no_speculative
+    args.llm_client = None
+    if 'content' in args.stages:
+        from tools.llm_client import LLMClient
+        args.llm_client = LLMClient()
+
+    progress = run_batch(city_files, args.stages, args)
+    if any(c['failed'] for c in progress.counts.values()):
+        print("\n部分任务失败，重新运行同一命令即可继续处理未完成的任务")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 各命令行入口的启动检查：运行参数、导入耗时预算（毫秒）、启动阶段不应导入的重量级模块
+ENTRY_POINTS = [
+    {
+        'name': 'tools.web_access --help',
+        'args': ['-m', 'tools.web_access', '--help'],
+        'budget_ms': 150,
+        'forbidden': ['selenium', 'webdriver_manager', 'bs4', 'pydantic', 'pydantic_settings'],
+    },
+    {
+        'name': 'tools.search --help',
+        'args': ['-m', 'tools.search', '--help'],
+        'budget_ms': 100,
+        'forbidden': ['duckduckgo_search', 'primp', 'requests', 'pydantic', 'pydantic_settings'],
+    },
+]
+
+def parse_importtime(stderr):
+    """
+    解析 -X importtime 的输出
+
+    Returns:
+        tuple: (顶层导入的累计耗时（微秒）, 导入的模块名集合)
+    """
+    total_us = 0
+    modules = set()
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _, cumulative_us, name = line.split('|')
+        modules.add(name.strip())
+        # 模块名前固定有一个空格，之后每层嵌套再缩进两个空格；顶层导入的累计耗时已包含所有子导入
+        if len(name) - len(name.lstrip()) == 1:
+            total_us += int(cumulative_us)
+    return total_us, modules
+
+def check_entry_point(entry, scale=1.0, runs=3):
+    """
+    多次运行入口并取最快一次的导入耗时，检查是否超出预算以及是否导入了重量级模块
+
+    Returns:
+        list: 问题描述列表，为空表示通过
+    """
+    best_us = None
+    modules = set()
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, '-X', 'importtime', *entry['args']],
+                                cwd=ROOT_DIR, capture_output=True, text=True)
+        total_us, modules = parse_importtime(result.stderr)
+        best_us = total_us if best_us is None else min(best_us, total_us)
+
+    budget_ms = entry['budget_ms'] * scale
+    elapsed_ms = best_us / 1000
+    print(f"{entry['name']}: 导入耗时 {elapsed_ms:.1f}ms（预算 {budget_ms:.0f}ms）")
+
+    problems = []
+    if elapsed_ms > budget_ms:
+        problems.append(f"{entry['name']} 导入耗时 {elapsed_ms:.1f}ms 超出预算 {budget_ms:.0f}ms")
+    for module in entry['forbidden']:
+        if module in modules or any(m.startswith(module + '.') for m in modules):
+            problems.append(f"{entry['name']} 在启动时导入了 {module}")
+    return problems
+
+def main():
+    parser = argparse.ArgumentParser(description='检查命令行入口的启动导入耗时是否超出预算')
+    parser.add_argument('--scale', type=float, default=1.0, help='预算缩放系数，较慢的机器可适当调大，默认1.0')
+    parser.add_argument('--runs', type=int, default=3, help='每个入口运行次数，取最快一次，默认3')
+    args = parser.parse_args()
+
+    problems = []
+    for entry in ENTRY_POINTS:
+        problems.extend(check_entry_point(entry, scale=args.scale, runs=args.runs))
+
+    if problems:
+        print("\n启动检查未通过：")
+        for problem in problems:
+            print(f"  - {problem}")
+        sys.exit(1)
+    print("\n启动检查通过")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import sys
+
+# 将导入路径调整到上层目录
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lib import storage
+
+CACHE_DIRS = ['cache/url_results', 'cache/search_results']
+
+def main():
+    parser = argparse.ArgumentParser(description='压缩缓存目录中的结果文件，并按保留策略清理旧文件')
+    parser.add_argument('dirs', nargs='*', default=CACHE_DIRS, help='缓存目录，默认为 url_results 和 search_results')
+    parser.add_argument('--format', choices=list(storage.FORMAT_SUFFIXES), default='gzip',
+                        help='目标格式，默认 gzip；json 可将压缩文件还原为可直接阅读的 JSON')
+    parser.add_argument('--max-age-days', type=int, help='最长保留天数，默认使用 CACHE_MAX_AGE_DAYS 配置')
+    parser.add_argument('--max-mb', type=int, help='每个目录的总大小上限（MB），默认使用 CACHE_MAX_MB 配置')
+    args = parser.parse_args()
+
+    from lib.env import config
+    max_age_days = config.cache_max_age_days if args.max_age_days is None else args.max_age_days
+    max_mb = config.cache_max_mb if args.max_mb is None else args.max_mb
+
+    for directory in args.dirs:
+        if not os.path.isdir(directory):
+            print(f"跳过不存在的目录: {directory}")
+            continue
+        removed = storage.apply_retention(directory, max_age_days, max_mb)
+        converted, before, after = storage.compact(directory, args.format)
+        print(f"{directory}: 删除 {len(removed)} 个过期文件，转换 {converted} 个文件，"
+              f"{before / 1024:.1f}KB -> {after / 1024:.1f}KB")
+
+if __name__ == "__main__":
+    main()
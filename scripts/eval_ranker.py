@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import os
+import sys
+import time
+from typing import List, Dict, Any
+
+# 将导入路径调整到上层目录
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lib import storage
+from tools.ranker import SearchResultRanker
+
+QUERY_SUFFIX = ' 旅游 景点介绍'
+
+def load_search_files(search_dir: str) -> List[Dict[str, Any]]:
+    """读取缓存目录下的所有搜索结果文件"""
+    samples = []
+    for path in sorted(storage.list_files(search_dir)):
+        data = storage.read_records(path)
+        results = list(data.get('results', []))
+        if results:
+            # 压缩缓存文件后，以不含后缀的文件名作为 key，使已记录的 LLM 结果仍然可用
+            samples.append({'file': storage.base_name(path) + '.json', 'query': data.get('query', ''), 'results': results})
+    return samples
+
+def load_llm_picks(cache_file: str) -> Dict[str, List[str]]:
+    """读取已记录的LLM筛选结果，key 为搜索结果文件名"""
+    if cache_file and os.path.exists(cache_file):
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+def evaluate(samples: List[Dict[str, Any]], llm_picks: Dict[str, List[str]], top_n: int = 3) -> Dict[str, Any]:
+    """对比本地排序与LLM的筛选结果"""
+    ranker = SearchResultRanker()
+    rows = []
+    for sample in samples:
+        expected = llm_picks.get(sample['file'])
+        if not expected:
+            continue
+        spot_name = sample['query'].replace(QUERY_SUFFIX, '').strip() or sample['query']
+
+        start = time.perf_counter()
+        selected, contested = ranker.select(spot_name, sample['results'], top_n=top_n)
+        elapsed_us = (time.perf_counter() - start) * 1e6
+
+        overlap = len(set(selected) & set(expected))
+        rows.append({
+            'file': sample['file'],
+            'query': spot_name,
+            'ranker': selected,
+            'llm': expected,
+            'overlap': overlap,
+            'top1_match': bool(selected) and selected[0] == expected[0],
+            'contested': len(contested),
+            'elapsed_us': round(elapsed_us, 1),
+        })
+
+    count = len(rows) or 1
+    return {
+        'samples': len(rows),
+        'top_n': top_n,
+        'precision': round(sum(r['overlap'] for r in rows) / (count * top_n), 4),
+        'top1_agreement': round(sum(r['top1_match'] for r in rows) / count, 4),
+        'tie_break_rate': round(sum(1 for r in rows if r['contested']) / count, 4),
+        'avg_elapsed_us': round(sum(r['elapsed_us'] for r in rows) / count, 1),
+        'rows': rows,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='离线评估本地搜索结果排序与LLM筛选结果的一致性')
+    parser.add_argument('--search-dir', default='cache/search_results', help='搜索结果缓存目录')
+    parser.add_argument('--llm-cache', default='cache/ranker_eval/llm_picks.json',
+                        help='LLM筛选结果记录文件，缺失的样本在指定 --record 时调用LLM补齐')
+    parser.add_argument('--record', action='store_true', help='为缺失的样本调用LLM并记录结果')
+    parser.add_argument('--top', type=int, default=3, help='每个样本选取的URL数量，默认3')
+    parser.add_argument('-o', '--output', help='评估报告输出路径（JSON）')
+    args = parser.parse_args()
+
+    samples = load_search_files(args.search_dir)
+    llm_picks = load_llm_picks(args.llm_cache)
+    print(f"共发现 {len(samples)} 个搜索结果样本，已记录 {len(llm_picks)} 个LLM筛选结果")
+
+    if args.record:
+        from tools.llm_client import LLMClient
+        from scripts.insert_content import filter_urls_with_llm
+        llm_client = LLMClient()
+        for sample in samples:
+            if sample['file'] in llm_picks:
+                continue
+            spot_name = sample['query'].replace(QUERY_SUFFIX, '').strip() or sample['query']
+            try:
+                llm_picks[sample['file']] = filter_urls_with_llm(llm_client, spot_name, sample['results'], top_n=args.top)
+            except Exception as e:
+                print(f"[ERROR] 记录 {sample['file']} 的LLM筛选结果失败: {str(e)}")
+        os.makedirs(os.path.dirname(args.llm_cache) or '.', exist_ok=True)
+        with open(args.llm_cache, 'w', encoding='utf-8') as f:
+            json.dump(llm_picks, f, ensure_ascii=False, indent=2)
+
+    report = evaluate(samples, llm_picks, top_n=args.top)
+    print(f"评估样本数: {report['samples']}")
+    print(f"Precision@{args.top}: {report['precision']}")
+    print(f"Top1 一致率: {report['top1_agreement']}")
+    print(f"需要LLM裁决的比例: {report['tie_break_rate']}")
+    print(f"平均排序耗时: {report['avg_elapsed_us']} 微秒")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"评估报告已保存到: {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 #!/usr/bin/env python3
+import argparse
 import json
 import os
 import sys
@@ -9,62 +10,96 @@ from typing import List, Dict, Any
 # 将导入路径调整到上层目录
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from lib.metrics import metrics
+from lib import storage
+from lib.retry import retry_call
 from tools.llm_client import LLMClient
+from tools.images import select_images
+from tools.ranker import SearchResultRanker
 from tools.search import DuckDuckGoSearcher
-from tools.web_access import process_urls
+from tools.web_access import process_urls, ResultCollector, SpeculativeFetcher
 
 def run_search(query: str) -> str:
     """执行搜索并返回结果文件路径"""
     print(f"\n[DEBUG] 开始搜索: {query}")
     searcher = DuckDuckGoSearcher()
-    searcher.search(query)
-    # 获取最新的搜索结果文件
-    search_dir = 'cache/search_results'
-    files = [os.path.join(search_dir, f) for f in os.listdir(search_dir) if f.endswith('.json')]
-    if not files:
+    # 使用 search 返回的文件而不是目录中最新的文件，多个景点并发处理时不会读到其他景点的结果
+    result_file = searcher.search(query)
+    if not result_file or not os.path.exists(result_file):
         raise Exception("No search results found")
-    result_file = max(files, key=os.path.getctime)
     print(f"[DEBUG] 搜索结果保存到: {result_file}")
     return result_file
 
 def read_search_results(file_path: str) -> List[Dict[str, str]]:
     """读取搜索结果"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    return data.get('results', [])
+    return list(storage.read_records(file_path).get('results', []))
 
-def filter_urls_with_llm(llm_client: LLMClient, spot_name: str, search_results: List[Dict[str, str]]) -> List[str]:
+def get_completion(llm_client: LLMClient, prompt: str) -> str:
+    """调用LLM，暂时性错误和限流会重试，LLM持续不可用时熔断，后续调用直接失败"""
+    return retry_call(llm_client.get_completion, prompt, endpoint='llm', max_attempts=3, base_delay=2)
+
+def filter_urls_with_llm(llm_client: LLMClient, spot_name: str, search_results: List[Dict[str, str]], top_n: int = 3) -> List[str]:
     """使用LLM筛选最相关的URL"""
     print(f"\n[DEBUG] 开始使用LLM筛选URL，景点名称: {spot_name}")
     prompt = f"""
 请帮我从以下搜索结果中选择最相关的URL，这些URL应该包含关于"{spot_name}"景点的详细介绍。
-我会给你一个搜索结果列表，每个结果包含标题、URL和摘要。请选择最相关的3个URL，只返回URL列表，每行一个URL。
+我会给你一个搜索结果列表，每个结果包含标题、URL和摘要。请选择最相关的{top_n}个URL，只返回URL列表，每行一个URL。
 
 搜索结果：
 {json.dumps(search_results, ensure_ascii=False, indent=2)}
 
 请直接返回URL列表，每行一个URL，不要有任何其他内容。"""
     
-    response = llm_client.get_completion(prompt)
+    with metrics.timer('llm_completion', purpose='filter_urls'):
+        response = get_completion(llm_client, prompt)
     urls = [url.strip() for url in response.split('\n') if url.strip().startswith('http')]
-    urls = urls[:3]  # 限制最多3个URL
+    urls = urls[:top_n]  # 限制最多top_n个URL
     print(f"[DEBUG] LLM筛选出的URL: {json.dumps(urls, ensure_ascii=False, indent=2)}")
     return urls
 
+def resolve_contested(llm_client: LLMClient, spot_name: str, selected: List[str], contested: List[Dict[str, Any]], top_n: int = 3) -> List[str]:
+    """分数领先的结果直接保留，只让LLM在并列候选中挑选剩余名额；没有并列或没有LLM时返回本地排序结果"""
+    if not contested or llm_client is None:
+        return selected
+
+    contested_links = {r['link'] for r in contested}
+    kept = [url for url in selected if url not in contested_links]
+    remaining = top_n - len(kept)
+    print(f"[DEBUG] {len(contested)} 个候选分数接近，使用LLM裁决剩余 {remaining} 个名额")
+    try:
+        candidates = [{k: r.get(k, '') for k in ('title', 'link', 'snippet')} for r in contested]
+        picked = [url for url in filter_urls_with_llm(llm_client, spot_name, candidates, top_n=remaining)
+                  if url in contested_links and url not in kept]
+    except Exception as e:
+        print(f"[ERROR] LLM裁决失败，使用本地排序结果: {str(e)}")
+        return selected
+
+    # LLM返回不足时按本地排序补齐
+    for r in contested:
+        if len(picked) >= remaining:
+            break
+        if r['link'] not in picked:
+            picked.append(r['link'])
+    return kept + picked[:remaining]
+
+def select_urls(llm_client: LLMClient, spot_name: str, search_results: List[Dict[str, str]], top_n: int = 3) -> List[str]:
+    """本地排序筛选最相关的URL，仅在分数接近时调用LLM裁决并列候选"""
+    selected, contested = SearchResultRanker().select(spot_name, search_results, top_n=top_n)
+    print(f"[DEBUG] 本地排序选出的URL: {json.dumps(selected, ensure_ascii=False, indent=2)}")
+    return resolve_contested(llm_client, spot_name, selected, contested, top_n=top_n)
+
 def access_urls(urls: List[str]) -> str:
     """访问URL并返回结果文件路径"""
-    process_urls(urls)
-    # 获取最新的URL访问结果文件
-    url_dir = 'cache/url_results'
-    files = [os.path.join(url_dir, f) for f in os.listdir(url_dir) if f.endswith('.json')]
-    if not files:
+    # 使用本次收集器保存的文件而不是目录中最新的文件，多个景点并发处理时不会读到其他景点的页面
+    collector = ResultCollector()
+    process_urls(urls, collector=collector)
+    if not collector.output_file:
         raise Exception("No URL results found")
-    return max(files, key=os.path.getctime)
+    return collector.output_file
 
 def read_url_results(file_path: str) -> Dict[str, Any]:
-    """读取URL访问结果"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    """读取URL访问结果，压缩格式的缓存在遍历 results 时逐条加载页面"""
+    return storage.read_records(file_path)
 
 def summarize_content_with_llm(llm_client: LLMClient, spot_name: str, url_results: Dict[str, Any]) -> List[Dict[str, Any]]:
     """使用LLM总结内容，返回符合JsonContent格式的内容列表"""
@@ -79,10 +114,16 @@ def summarize_content_with_llm(llm_client: LLMClient, spot_name: str, url_result
     
     print(f"[DEBUG] 收集到的文本数量: {len(all_texts)}")
     print(f"[DEBUG] 收集到的图片数量: {len(all_images)}")
+    # 过滤图标、追踪像素和小图，只把排序靠前的候选图片交给LLM
+    with metrics.timer('select_images'):
+        candidate_images = select_images(all_images, query=spot_name, limit=6)
+    all_images = [{'url': image['url'], 'alt': image['alt']} for image in candidate_images]
+    print(f"[DEBUG] 筛选后的候选图片数量: {len(all_images)}")
     
     # 合并文本并检查token数量
     combined_text = ' '.join(all_texts)
-    total_tokens = llm_client.count_tokens(combined_text)
+    with metrics.timer('llm_count_tokens'):
+        total_tokens = llm_client.count_tokens(combined_text)
     print(f"[DEBUG] 文本总token数量: {total_tokens}")
     
     # 如果token数量超过限制的80%，进行分段处理
@@ -155,7 +196,8 @@ def summarize_content_with_llm(llm_client: LLMClient, spot_name: str, url_result
 """
             
             try:
-                response = llm_client.get_completion(prompt)
+                with metrics.timer('llm_completion', purpose='summarize_segment'):
+                    response = get_completion(llm_client, prompt)
                 result = json.loads(response)
                 all_content.extend(result['content'])
             except Exception as e:
@@ -193,7 +235,8 @@ def summarize_content_with_llm(llm_client: LLMClient, spot_name: str, url_result
 """
         
         try:
-            response = llm_client.get_completion(prompt)
+            with metrics.timer('llm_completion', purpose='summarize'):
+                response = get_completion(llm_client, prompt)
             result = json.loads(response)
             all_content = result['content']
         except Exception as e:
@@ -202,7 +245,7 @@ def summarize_content_with_llm(llm_client: LLMClient, spot_name: str, url_result
     
     # 添加图片到内容中
     if all_images and isinstance(all_content, list):
-        selected_images = all_images[:3]  # 选择前3张图片
+        selected_images = all_images[:3]  # 选择排序最靠前的3张图片
         for image in selected_images:
             if image.get('url'):
                 all_content.append({
@@ -238,30 +281,46 @@ def format_raw_content(url_results: Dict[str, Any]) -> List[Dict[str, Any]]:
                 })
     return content
 
-def process_spot(spot_name: str, llm_client: LLMClient) -> List[Dict[str, Any]]:
+def process_spot(spot_name: str, llm_client: LLMClient, speculative: bool = True, prefetch_count: int = 5) -> List[Dict[str, Any]]:
     """处理单个景点，返回content列表"""
     print(f"\n[DEBUG] ====== 开始处理景点: {spot_name} ======")
     # 1. 搜索景点信息
-    search_file = run_search(f"{spot_name} 旅游 景点介绍")
+    with metrics.timer('run_search', spot=spot_name):
+        search_file = run_search(f"{spot_name} 旅游 景点介绍")
     search_results = read_search_results(search_file)
     print(f"[DEBUG] 搜索到 {len(search_results)} 条结果")
     
-    # 2. 使用LLM筛选最相关的URL
-    selected_urls = filter_urls_with_llm(llm_client, spot_name, search_results)
+    # 2. 本地排序筛选最相关的URL（分数接近时由LLM裁决）
+    selected, contested = SearchResultRanker().select(spot_name, search_results)
+    print(f"[DEBUG] 本地排序选出的URL: {json.dumps(selected, ensure_ascii=False, indent=2)}")
     
-    # 3. 访问选中的URL
-    print("[DEBUG] 开始访问选中的URL")
-    url_result_file = access_urls(selected_urls)
-    url_results = read_url_results(url_result_file)
+    if speculative and contested and llm_client is not None:
+        # 2-3. 等待LLM裁决时推测性预取选中和并列的候选URL，裁决后只采用选中的结果
+        candidates = list(dict.fromkeys(selected + [r['link'] for r in contested]))
+        with SpeculativeFetcher(max_workers=min(prefetch_count, len(candidates))) as fetcher:
+            print(f"[DEBUG] 开始预取 {len(candidates)} 个候选URL")
+            fetcher.prefetch(candidates)
+            selected_urls = resolve_contested(llm_client, spot_name, selected, contested)
+            print("[DEBUG] 等待选中URL的抓取结果")
+            with metrics.timer('fetch_selected_urls', spot=spot_name):
+                url_result_file, url_results = fetcher.collect(selected_urls)
+    else:
+        # 3. 没有待裁决的候选时直接访问选中的URL，使用 process_urls 的并发、重试和熔断配置
+        selected_urls = resolve_contested(llm_client, spot_name, selected, contested)
+        print("[DEBUG] 开始访问选中的URL")
+        with metrics.timer('fetch_selected_urls', spot=spot_name):
+            url_result_file = access_urls(selected_urls)
+        url_results = read_url_results(url_result_file)
     print(f"[DEBUG] URL访问结果保存到: {url_result_file}")
     
     # 4. 使用LLM总结内容
-    content = summarize_content_with_llm(llm_client, spot_name, url_results)
+    with metrics.timer('summarize_content', spot=spot_name):
+        content = summarize_content_with_llm(llm_client, spot_name, url_results)
     print(f"[DEBUG] 内容总结完成，生成了 {len(content)} 个内容块")
     print("[DEBUG] ====== 景点处理完成 ======\n")
     return content
 
-def process_ndjson_file(input_file: str):
+def process_ndjson_file(input_file: str, speculative: bool = True):
     """处理NDJSON文件，添加content字段，处理一条立即更新源文件"""
     print(f"\n[DEBUG] 开始处理文件: {input_file}")
     llm_client = LLMClient()
@@ -277,7 +336,8 @@ def process_ndjson_file(input_file: str):
         
         if 'name' in data and not data.get('content'):
             try:
-                content = process_spot(data['name'], llm_client)
+                with metrics.timer('process_spot', spot=data['name']):
+                    content = process_spot(data['name'], llm_client, speculative=speculative)
                 data['content'] = content
                 print(f"[DEBUG] 成功添加content字段")
                 
@@ -291,6 +351,7 @@ def process_ndjson_file(input_file: str):
                 
                 time.sleep(1)  # 添加延迟，避免请求过快
             except Exception as e:
+                metrics.incr('spots_failed')
                 print(f"[ERROR] 处理 {data['name']} 时出错: {str(e)}")
         else:
             print(f"[DEBUG] 跳过处理: {'name' not in data and '缺少name字段' or 'content已存在'}")
@@ -298,16 +359,18 @@ def process_ndjson_file(input_file: str):
     print(f"[DEBUG] 处理完成")
 
 def main():
-    if len(sys.argv) != 2:
-        print("Usage: python insert_content.py <input_ndjson_file>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description='为 ndjson 文件中的景点添加介绍内容')
+    parser.add_argument('input_file', help='输入的 ndjson 文件路径')
+    parser.add_argument('--no-speculative', action='store_true',
+                        help='关闭推测性预取，筛选完URL后再开始抓取')
+    args = parser.parse_args()
     
-    input_file = sys.argv[1]
+    input_file = args.input_file
     if not os.path.exists(input_file):
         print(f"Input file {input_file} does not exist")
         sys.exit(1)
     
-    process_ndjson_file(input_file)
+    process_ndjson_file(input_file, speculative=not args.no_speculative)
 
 if __name__ == "__main__":
     main()
@@ -3,7 +3,14 @@ import json
 import argparse
 import sys
 import time
+import os
 from pathlib import Path
+
+# 将导入路径调整到上层目录
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lib.metrics import metrics
+from lib.retry import retry_call
 from get_coordinate import get_coordinate
 
 def process_file(input_file: str, output_file: str = None, key: str = "ZIEBZ-RF5RL-N3XPI-MX6MU-HINTO-LJFEX"):
@@ -42,7 +49,13 @@ def process_file(input_file: str, output_file: str = None, key: str = "ZIEBZ-RF5
                 processed_count += 1
                 print(f"正在处理第 {processed_count}/{total_count} 条记录: {record['name']}")
                 
-                coordinates = get_coordinate(record['location'], key)
+                try:
+                    with metrics.timer('geocode', name=record['name']):
+                        coordinates = retry_call(get_coordinate, record['location'], key,
+                                                 endpoint='tencent_map', max_attempts=3)
+                except Exception as e:
+                    print(f"获取坐标出错: {str(e)}")
+                    coordinates = None
                 if coordinates:
                     record['coordinate'] = {
                         'longitude': coordinates[0],
@@ -2,10 +2,16 @@ import os
 import sys
 import json
 import time
-import subprocess
 from typing import Dict
+
+# 将导入路径调整到上层目录
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 from tools.llm_client import LLMClient
-from lib.utils import retry_with_backoff
+from tools.search import DuckDuckGoSearcher
+from lib import storage
+from lib.retry import retry_call
+from lib.metrics import metrics
 
 class LocationVerifier:
     def __init__(self, attractions_file: str):
@@ -28,26 +34,14 @@ class LocationVerifier:
         with open(self.attractions_file, 'w', encoding='utf-8') as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
             
-    @retry_with_backoff(max_retries=3, initial_delay=2)
     def search_location(self, query: str) -> dict:
-        """执行搜索并返回搜索结果"""
-        cmd = f"python3 search.py \"{query}\""
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-        if result.returncode != 0:
-            raise RuntimeError(f"搜索失败: {result.stderr}")
-            
-        # 从输出中提取文件路径
-        output = result.stdout.strip()
-        if output.startswith("Search results saved to: "):
-            search_result_file = output.replace("Search results saved to: ", "").strip()
-        else:
-            raise RuntimeError(f"无法解析搜索结果文件路径: {output}")
-            
-        # 读取搜索结果
-        with open(search_result_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        """执行搜索并返回搜索结果（重试和限速由 DuckDuckGoSearcher 内部的 lib.retry 处理）"""
+        search_result_file = DuckDuckGoSearcher().search(query)
+        if not search_result_file or not os.path.exists(search_result_file):
+            raise RuntimeError(f"搜索失败: {query}")
+        data = storage.read_records(search_result_file)
+        return {**data, 'results': list(data.get('results', []))}
             
-    @retry_with_backoff(max_retries=3, initial_delay=2)
     def verify_location(self, name: str, current_location: str) -> str:
         """验证单个景点的地址"""
         # 构建搜索查询
@@ -55,7 +49,8 @@ class LocationVerifier:
         
         # 执行搜索
         try:
-            search_data = self.search_location(query)
+            with metrics.timer('verify_search', query=query):
+                search_data = self.search_location(query)
         except Exception as e:
             raise RuntimeError(f"搜索过程失败: {str(e)}")
             
@@ -74,7 +69,9 @@ class LocationVerifier:
         system_prompt = "你是一个帮助提取和验证地址的助手。请只返回地址，不要包含任何其他内容。"
         
         try:
-            return self.llm_client.get_completion(prompt, system_prompt)
+            with metrics.timer('llm_completion', purpose='verify_address'):
+                return retry_call(self.llm_client.get_completion, prompt, system_prompt,
+                                  endpoint='llm', max_attempts=3, base_delay=2)
         except Exception as e:
             raise RuntimeError(f"调用 DeepSeek API 失败: {e}")
         
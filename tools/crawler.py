@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from lib.env import config
+from lib.metrics import metrics
+from lib.retry import get_breaker, record_outcome, endpoint_for_url
+from tools.web_access import ChromeDriver, ResultCollector
+import hashlib
+import math
+import re
+
+# 常见的追踪参数，规范化URL时去除
+TRACKING_PARAMS = {'spm', 'share_token', 'gclid', 'fbclid', 'yclid'}
+# 非网页资源的扩展名，爬取时跳过
+SKIPPED_EXTENSIONS = (
+    '.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg', '.ico', '.bmp',
+    '.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx',
+    '.zip', '.rar', '.7z', '.gz', '.tar', '.exe', '.apk', '.dmg',
+    '.mp3', '.mp4', '.avi', '.mov', '.flv', '.css', '.js', '.json', '.xml',
+)
+
+def normalize_url(url):
+    """
+    规范化URL，使指向同一页面的不同写法得到相同结果
+
+    小写协议和域名、去除默认端口、片段和追踪参数，并对查询参数排序
+
+    Args:
+        url: 原始URL
+
+    Returns:
+        str: 规范化后的URL，非 http/https 链接返回 None
+    """
+    parsed = urlparse(url.strip())
+    scheme = parsed.scheme.lower()
+    if scheme not in ('http', 'https') or not parsed.hostname:
+        return None
+
+    host = parsed.hostname.lower()
+    if parsed.port and not (scheme == 'http' and parsed.port == 80 or scheme == 'https' and parsed.port == 443):
+        host = f"{host}:{parsed.port}"
+
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True)
+        if not k.lower().startswith('utm_') and k.lower() not in TRACKING_PARAMS
+    )
+    return urlunparse((scheme, host, parsed.path or '/', parsed.params, urlencode(query), ''))
+
+class BloomFilter:
+    """布隆过滤器，用于大规模爬取时以固定内存记录已见过的URL"""
+
+    def __init__(self, capacity, error_rate=0.001):
+        """
+        初始化布隆过滤器
+
+        Args:
+            capacity: 预计插入的元素数量
+            error_rate: 可接受的误判率
+        """
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        # 双重哈希：由一个 128 位摘要派生出 k 个位置
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, item):
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def __len__(self):
+        return self.count
+
+class Crawler:
+    """有界爬虫：从种子URL出发，按广度优先顺序沿页面中的链接抓取"""
+
+    def __init__(self, seeds, max_depth=1, max_pages=50, same_domain=True, allow_domains=None,
+                 include=None, exclude=None, workers=2, tabs=5, extract_mode=None, bloom=None, wait_time=2):
+        """
+        初始化爬虫
+
+        Args:
+            seeds: 种子URL列表
+            max_depth: 最大链接深度，种子页面深度为0
+            max_pages: 最多抓取的页面数
+            same_domain: 是否只抓取与种子URL相同域名（含子域名）的页面
+            allow_domains: 额外允许的域名列表（含子域名）
+            include: URL 必须匹配其中至少一个的正则表达式列表
+            exclude: URL 匹配其中任意一个即跳过的正则表达式列表
+            workers: 同时运行的浏览器数量
+            tabs: 每个浏览器同时加载的标签页数量
+            extract_mode: 内容提取方式 html/dom，None 表示使用 EnvConfig.extract_mode
+            bloom: 是否使用布隆过滤器记录已见URL，None 表示 max_pages 较大时自动启用
+            wait_time: 每个页面加载完成后的等待时间（秒）
+        """
+        # 抓取和保存使用原始URL，规范化结果只用于去重和过滤，避免改写服务器收到的请求
+        self.seeds = [url.strip() for url in seeds if normalize_url(url)]
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.workers = max(1, workers)
+        self.tabs = max(1, tabs)
+        self.extract_mode = extract_mode or config.extract_mode
+        self.wait_time = wait_time
+
+        self.allowed_hosts = set()
+        if same_domain:
+            self.allowed_hosts.update(self._strip_www(urlparse(url).hostname) for url in self.seeds)
+        self.allowed_hosts.update(d.lower() for d in (allow_domains or []))
+        self.include = [re.compile(p) for p in (include or [])]
+        self.exclude = [re.compile(p) for p in (exclude or [])]
+
+        if bloom is None:
+            bloom = max_pages >= 5000
+        # 每个页面平均约有数十个链接，按页面数的50倍估算已见URL数量
+        self.seen = BloomFilter(max_pages * 50) if bloom else set()
+
+    @staticmethod
+    def _strip_www(host):
+        return host[4:] if host.startswith('www.') else host
+
+    def _host_allowed(self, host):
+        if not self.allowed_hosts:
+            return True
+        host = self._strip_www(host)
+        return any(host == allowed or host.endswith('.' + allowed) for allowed in self.allowed_hosts)
+
+    def should_visit(self, url):
+        """判断规范化后的URL是否符合域名和URL模式的限制"""
+        parsed = urlparse(url)
+        if parsed.path.lower().endswith(SKIPPED_EXTENSIONS):
+            return False
+        if not self._host_allowed(parsed.hostname or ''):
+            return False
+        if self.include and not any(p.search(url) for p in self.include):
+            return False
+        if any(p.search(url) for p in self.exclude):
+            return False
+        return True
+
+    def _fetch_level(self, drivers, urls):
+        """用多个浏览器并发抓取同一深度的一批URL，返回 (URL, 内容, 异常) 列表"""
+        groups = [urls[i::len(drivers)] for i in range(len(drivers))]
+
+        def fetch_group(driver, group):
+            return list(driver.get_pages_content(group, tabs=self.tabs, wait_time=self.wait_time,
+                                                 extract_mode=self.extract_mode))
+
+        with ThreadPoolExecutor(max_workers=len(drivers)) as executor:
+            futures = [executor.submit(fetch_group, driver, group) for driver, group in zip(drivers, groups) if group]
+            results = []
+            for future, group in zip(futures, [g for g in groups if g]):
+                try:
+                    results.extend(future.result())
+                except Exception as e:
+                    results.extend((url, None, e) for url in group)
+            return results
+
+    def crawl(self, collector=None):
+        """
+        执行爬取，结果写入收集器
+
+        Args:
+            collector: 结果收集器，默认新建一个 ResultCollector
+
+        Returns:
+            ResultCollector: 包含所有成功抓取页面的收集器，每条结果附带 depth 字段
+        """
+        collector = collector or ResultCollector()
+        frontier = deque()
+        for url in self.seeds:
+            key = normalize_url(url)
+            if key not in self.seen:
+                self.seen.add(key)
+                frontier.append((url, 0))
+
+        fetched = 0
+        drivers = [ChromeDriver(page_load_strategy='none') for _ in range(self.workers)]
+        try:
+            while frontier and fetched < self.max_pages:
+                # 取出当前深度的一批URL，不超过剩余的页面配额
+                depth = frontier[0][1]
+                batch = []
+                while frontier and frontier[0][1] == depth and len(batch) < self.max_pages - fetched:
+                    url = frontier.popleft()[0]
+                    # 域名持续失败已熔断的页面直接跳过，不占用浏览器
+                    if get_breaker(endpoint_for_url(url)).state == 'open':
+                        metrics.incr('crawl_pages_skipped')
+                        continue
+                    batch.append(url)
+                if not batch:
+                    continue
+
+                print(f"[DEBUG] 抓取深度 {depth} 的 {len(batch)} 个页面（已抓取 {fetched}/{self.max_pages}）")
+                active = drivers[:max(1, min(len(drivers), -(-len(batch) // self.tabs)))]
+                for url, content, error in self._fetch_level(active, batch):
+                    fetched += 1
+                    record_outcome(endpoint_for_url(url), error)
+                    if error is not None:
+                        metrics.incr('crawl_pages_failed')
+                        print(f"Failed to process {url}: {str(error)}")
+                        continue
+
+                    collector.add_result(url, content, depth=depth)
+                    metrics.incr('crawl_pages_fetched')
+                    print(f"Successfully processed {url}")
+                    if depth >= self.max_depth:
+                        continue
+                    for link in content['links']:
+                        key = normalize_url(link['url'])
+                        if key and key not in self.seen and self.should_visit(key):
+                            self.seen.add(key)
+                            frontier.append((link['url'], depth + 1))
+        finally:
+            for driver in drivers:
+                driver.quit()
+
+        print(f"[DEBUG] 爬取完成，共抓取 {fetched} 个页面，发现 {len(self.seen)} 个URL，剩余 {len(frontier)} 个未抓取")
+        return collector
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+# 客户端路径（forward/print_response）只依赖标准库，保证 tools.search / tools.web_access 启动仍然很快；
+# 服务端依赖在 FetchDaemon 中按需导入。
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from collections import OrderedDict
+import urllib.request
+import urllib.error
+import argparse
+import threading
+import secrets
+import queue
+import hmac
+import json
+import time
+import sys
+import os
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 服务启动后写入监听地址，客户端据此判断服务是否在运行
+STATE_FILE = os.path.join(ROOT_DIR, 'cache', 'daemon.json')
+# 每次启动随机生成的访问令牌，写入仅当前用户可读的状态文件，防止网页跨域向本地服务发送请求
+TOKEN_HEADER = 'X-Daemon-Token'
+
+def read_state():
+    """读取服务状态文件，服务未运行时返回 None"""
+    try:
+        with open(STATE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def forward(path, payload=None, timeout=600):
+    """
+    将请求转发给本地常驻服务
+
+    Args:
+        path: 接口路径，例如 /search、/fetch
+        payload: 请求内容，为 None 时发送 GET 请求
+        timeout: 超时时间（秒）
+
+    Returns:
+        dict: 服务返回的结果；服务未运行或请求失败时返回 None，调用方应回退到进程内执行
+    """
+    state = read_state()
+    if not state:
+        return None
+
+    url = f"http://{state['host']}:{state['port']}{path}"
+    data = None if payload is None else json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    headers = {'Content-Type': 'application/json', TOKEN_HEADER: state.get('token', '')}
+    request = urllib.request.Request(url, data=data, headers=headers)
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return json.loads(response.read().decode('utf-8'))
+    except urllib.error.HTTPError as e:
+        print(f"[DEBUG] 常驻服务处理失败（{e.code}），改为在当前进程中执行", file=sys.stderr)
+        return None
+    except (urllib.error.URLError, OSError, ValueError):
+        # 服务已退出但状态文件残留
+        return None
+
+def print_response(response):
+    """按进程内执行时相同的格式输出服务返回的结果"""
+    for line in response.get('lines', []):
+        print(line)
+
+class MemoryCache:
+    """带过期时间的 LRU 内存缓存"""
+
+    def __init__(self, ttl=3600, max_entries=1000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires < time.monotonic():
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = (value, time.monotonic() + self.ttl)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+class FetchDaemon:
+    """常驻服务：持有预热的浏览器、DDG 客户端和内存缓存"""
+
+    def __init__(self, browsers=3, cache_ttl=3600):
+        """
+        初始化常驻服务
+
+        Args:
+            browsers: 预热的浏览器数量
+            cache_ttl: 搜索结果和页面内容的缓存时间（秒）
+        """
+        from tools.web_access import ChromeDriver
+        from tools.search import DuckDuckGoSearcher
+
+        self.browsers = browsers
+        self.pool = queue.Queue()
+        for _ in range(browsers):
+            self.pool.put(ChromeDriver(reused=True))
+        self.page_cache = MemoryCache(ttl=cache_ttl)
+        self.search_cache = MemoryCache(ttl=cache_ttl)
+
+        self._ddgs = None
+        # DDG 客户端不保证线程安全，搜索串行执行
+        self._search_lock = threading.Lock()
+        self.searcher = DuckDuckGoSearcher(ddgs_factory=self._shared_ddgs)
+
+    @contextmanager
+    def _shared_ddgs(self):
+        """复用同一个 DDGS 客户端，出错时丢弃以便下次重建"""
+        from tools.search import _load_ddgs
+
+        if self._ddgs is None:
+            self._ddgs = _load_ddgs()()
+        try:
+            yield self._ddgs
+        except Exception:
+            self._ddgs = None
+            raise
+
+    def warm_up(self):
+        """并发启动所有浏览器"""
+        drivers = [self.pool.get() for _ in range(self.browsers)]
+        with ThreadPoolExecutor(max_workers=len(drivers)) as executor:
+            list(executor.map(lambda driver: driver.create_driver(), drivers))
+        for driver in drivers:
+            self.pool.put(driver)
+
+    @contextmanager
+    def _borrow_driver(self):
+        driver = self.pool.get()
+        try:
+            yield driver
+        finally:
+            self.pool.put(driver)
+
+    def search(self, query):
+        cached = self.search_cache.get(query)
+        if cached and os.path.exists(cached):
+            return {'lines': [f"Search results saved to: {cached}"], 'output_file': cached, 'cached': True}
+
+        with self._search_lock:
+            result = self.searcher.search(query)
+        if result and os.path.exists(result):
+            output_file = os.path.abspath(result)
+            self.search_cache.put(query, output_file)
+            return {'lines': [f"Search results saved to: {output_file}"], 'output_file': output_file}
+        # 无结果时 search 返回 JSON 错误信息（进程内执行时不输出），重试耗尽时返回 None
+        return {'lines': [] if result else [json.dumps({"error": "Search failed, see daemon log for details."})]}
+
+    def fetch(self, urls, extract_mode=None):
+        from lib.env import config
+        from tools.web_access import ResultCollector, fetch_with_driver
+
+        extract_mode = extract_mode or config.extract_mode
+        collector = ResultCollector()
+
+        def fetch_one(url):
+            content = self.page_cache.get((url, extract_mode))
+            if content is None:
+                with self._borrow_driver() as driver:
+                    content = fetch_with_driver(driver, url, extract_mode)
+                self.page_cache.put((url, extract_mode), content)
+            collector.add_result(url, content)
+
+        lines = []
+        with ThreadPoolExecutor(max_workers=self.browsers) as executor:
+            futures = {url: executor.submit(fetch_one, url) for url in urls}
+            for url, future in futures.items():
+                try:
+                    future.result()
+                    lines.append(f"Successfully processed {url}")
+                except Exception as e:
+                    lines.append(f"Failed to process {url}: {str(e)}")
+
+        output_file = os.path.abspath(collector.save_to_file())
+        lines.extend(['', f"All results saved to: {output_file}"])
+        return {'lines': lines, 'output_file': output_file}
+
+    def close(self):
+        while not self.pool.empty():
+            self.pool.get().quit()
+
+class DaemonRequestHandler(BaseHTTPRequestHandler):
+    """常驻服务的 HTTP 接口"""
+
+    daemon = None
+    token = None
+
+    def _send_json(self, status, data):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _authorized(self):
+        """校验访问令牌，失败时直接返回 403"""
+        if hmac.compare_digest(self.headers.get(TOKEN_HEADER, ''), self.token):
+            return True
+        self._send_json(403, {'error': 'forbidden'})
+        return False
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        if self.path == '/health':
+            self._send_json(200, {'status': 'ok', 'pid': os.getpid(), 'browsers': self.daemon.browsers})
+        else:
+            self._send_json(404, {'error': 'not found'})
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        # 只接受 JSON 请求，浏览器无需预检即可发送的 text/plain 等简单请求一律拒绝
+        content_type = self.headers.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type != 'application/json':
+            self._send_json(415, {'error': 'Content-Type must be application/json'})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(length) or b'{}')
+            if not isinstance(payload, dict):
+                raise ValueError('request body must be a JSON object')
+        except ValueError as e:
+            self._send_json(400, {'error': f'invalid request body: {e}'})
+            return
+
+        try:
+            if self.path == '/search':
+                self._send_json(200, self.daemon.search(payload['query']))
+            elif self.path == '/fetch':
+                self._send_json(200, self.daemon.fetch(payload['urls'], payload.get('extract_mode')))
+            elif self.path == '/shutdown':
+                self._send_json(200, {'status': 'stopping'})
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+            else:
+                self._send_json(404, {'error': 'not found'})
+        except KeyError as e:
+            self._send_json(400, {'error': f'missing field: {e}'})
+        except Exception as e:
+            self._send_json(500, {'error': str(e)})
+
+    def log_message(self, format, *args):
+        print(f"[DEBUG] {self.address_string()} {format % args}", file=sys.stderr)
+
+def serve(host, port, browsers, cache_ttl, warm=True):
+    """在前台运行常驻服务，直到收到 /shutdown 请求或 Ctrl+C"""
+    daemon = FetchDaemon(browsers=browsers, cache_ttl=cache_ttl)
+    if warm:
+        print(f"正在预热 {browsers} 个浏览器...")
+        daemon.warm_up()
+
+    token = secrets.token_urlsafe(32)
+    handler = type('Handler', (DaemonRequestHandler,), {'daemon': daemon, 'token': token})
+    httpd = ThreadingHTTPServer((host, port), handler)
+    os.makedirs(os.path.dirname(STATE_FILE), exist_ok=True)
+    # 状态文件包含访问令牌，仅允许当前用户读写
+    fd = os.open(STATE_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    os.fchmod(fd, 0o600)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump({'host': host, 'port': httpd.server_address[1], 'pid': os.getpid(), 'token': token}, f)
+    print(f"常驻服务已启动: http://{host}:{httpd.server_address[1]}")
+
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        daemon.close()
+        state = read_state()
+        if state and state.get('pid') == os.getpid():
+            os.remove(STATE_FILE)
+        print("常驻服务已停止")
+
+def main():
+    parser = argparse.ArgumentParser(description='本地常驻抓取服务，tools.search 和 tools.web_access 会自动转发给它')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    start_parser = subparsers.add_parser('start', help='在前台启动服务')
+    start_parser.add_argument('--host', help='监听地址，默认使用 DAEMON_HOST 配置')
+    start_parser.add_argument('--port', type=int, help='监听端口，默认使用 DAEMON_PORT 配置')
+    start_parser.add_argument('--browsers', type=int, help='预热的浏览器数量，默认使用 DAEMON_BROWSERS 配置')
+    start_parser.add_argument('--no-warm', action='store_true', help='不预先启动浏览器，首次请求时再启动')
+    subparsers.add_parser('status', help='查看服务状态')
+    subparsers.add_parser('stop', help='停止服务')
+    args = parser.parse_args()
+
+    if args.command == 'start':
+        from lib.env import config
+        serve(
+            args.host or config.daemon_host,
+            config.daemon_port if args.port is None else args.port,
+            args.browsers or config.daemon_browsers,
+            config.daemon_cache_ttl,
+            warm=not args.no_warm
+        )
+    elif args.command == 'status':
+        health = forward('/health', timeout=5)
+        print(json.dumps(health, ensure_ascii=False) if health else "常驻服务未运行")
+    elif args.command == 'stop':
+        print("常驻服务正在停止" if forward('/shutdown', {}, timeout=5) else "常驻服务未运行")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse, urlunparse
+from lib.metrics import metrics
+from tools.ranker import tokenize
+import argparse
+import json
+import math
+import re
+import struct
+
+# 文件名中作为独立词出现即视为图标、装饰图或占位图；前后不能紧跟字母，
+# 避免误伤 narrow_street.jpg、sharepoint.jpg 这类文件名，1x1 等尺寸由 SIZE_IN_URL 处理
+UNWANTED_PATTERN = re.compile(
+    r'(?<![a-z])(logo|icon|favicon|sprite|avatar|emoji|emoticon|badge|button|btn|arrow|qrcode|qr_code|erweima|'
+    r'loading|spinner|placeholder|blank|spacer|pixel|tracking|beacon|share|weixin|wechat|weibo)s?(?![a-z])'
+    r'|二维码|扫码|图标',
+    re.IGNORECASE
+)
+# alt 只在整体等于这些词时丢弃，"Iconic view of West Lake" 这类描述性文字不受影响
+UNWANTED_ALTS = {
+    'logo', 'icon', 'favicon', 'avatar', 'emoji', 'badge', 'button', 'arrow', 'qrcode', 'qr code',
+    'loading', 'placeholder', 'spacer', 'share', 'wechat', 'weibo', '二维码', '扫码', '图标', '头像', '分享',
+}
+# 统计和广告域名，其中的图片一般是追踪像素
+TRACKER_HOSTS = (
+    'doubleclick.net', 'google-analytics.com', 'googletagmanager.com', 'hm.baidu.com',
+    'cnzz.com', 'scorecardresearch.com', 'facebook.com', 'mmstat.com',
+)
+SKIPPED_EXTENSIONS = ('.svg', '.ico', '.cur')
+# URL 中常见的尺寸写法，例如 _16x16.png、/100x100/
+SIZE_IN_URL = re.compile(r'(?<![0-9])(\d{1,4})[x*](\d{1,4})(?![0-9])')
+# 不适合展示的图片类型；其他 image/* 均接受（包括 image/jpg、image/pjpeg 等非标准写法）
+REJECTED_IMAGE_TYPES = ('image/svg+xml', 'image/x-icon', 'image/vnd.microsoft.icon')
+# 对象存储 CDN 常用的通用二进制类型，无法据此判断是否为图片
+GENERIC_TYPES = ('application/octet-stream', 'binary/octet-stream')
+
+def _normalize_image_url(url):
+    """去除片段并小写域名，用于图片去重"""
+    parsed = urlparse(url)
+    return urlunparse((parsed.scheme.lower(), parsed.netloc.lower(), parsed.path, parsed.params, parsed.query, ''))
+
+def is_unwanted(image, min_dimension=200):
+    """
+    根据 URL 和 alt 判断图片是否为图标、追踪像素等无需探测的图片
+
+    Args:
+        image: {'url', 'alt'} 图片信息
+        min_dimension: URL 中标注的宽高都小于该值时视为小图
+
+    Returns:
+        bool: 是否丢弃
+    """
+    url = image.get('url') or ''
+    parsed = urlparse(url)
+    if parsed.scheme not in ('http', 'https'):
+        # data: URI 基本都是占位图或追踪像素
+        return True
+
+    host = (parsed.hostname or '').lower()
+    if any(host == h or host.endswith('.' + h) for h in TRACKER_HOSTS):
+        return True
+
+    path = parsed.path.lower()
+    if path.endswith(SKIPPED_EXTENSIONS):
+        return True
+    filename = path.rsplit('/', 1)[-1]
+    if UNWANTED_PATTERN.search(filename) or (image.get('alt') or '').strip().lower() in UNWANTED_ALTS:
+        return True
+
+    sizes = [(int(w), int(h)) for w, h in SIZE_IN_URL.findall(path)]
+    if sizes and all(w < min_dimension and h < min_dimension for w, h in sizes):
+        return True
+    return False
+
+def parse_dimensions(data):
+    """
+    从图片文件头解析宽高，支持 PNG、GIF、JPEG 和 WebP
+
+    Args:
+        data: 图片开头的若干字节
+
+    Returns:
+        tuple: (宽, 高)，无法解析时返回 None
+    """
+    if data[:8] == b'\x89PNG\r\n\x1a\n' and len(data) >= 24:
+        return struct.unpack('>II', data[16:24])
+
+    if data[:6] in (b'GIF87a', b'GIF89a') and len(data) >= 10:
+        return struct.unpack('<HH', data[6:10])
+
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP' and len(data) >= 30:
+        chunk = data[12:16]
+        if chunk == b'VP8 ':
+            w, h = struct.unpack('<HH', data[26:30])
+            return w & 0x3fff, h & 0x3fff
+        if chunk == b'VP8L':
+            bits = int.from_bytes(data[21:25], 'little')
+            return (bits & 0x3fff) + 1, ((bits >> 14) & 0x3fff) + 1
+        if chunk == b'VP8X':
+            return int.from_bytes(data[24:27], 'little') + 1, int.from_bytes(data[27:30], 'little') + 1
+        return None
+
+    if data[:2] == b'\xff\xd8':
+        # 逐个跳过 JPEG 段，直到 SOF 段（记录了图片宽高）
+        pos = 2
+        while pos + 9 <= len(data):
+            if data[pos] != 0xff:
+                return None
+            marker = data[pos + 1]
+            if marker == 0xff:
+                pos += 1
+                continue
+            if marker in (0xd8, 0x01) or 0xd0 <= marker <= 0xd7:
+                pos += 2
+                continue
+            length = struct.unpack('>H', data[pos + 2:pos + 4])[0]
+            if 0xc0 <= marker <= 0xcf and marker not in (0xc4, 0xc8, 0xcc):
+                h, w = struct.unpack('>HH', data[pos + 5:pos + 9])
+                return w, h
+            pos += 2 + length
+    return None
+
+def _create_session(pool_size):
+    """创建带连接池的 HTTP 会话，同一域名的探测请求复用连接"""
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers['User-Agent'] = ('Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 '
+                                     '(KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36')
+    return session
+
+def probe_image(session, url, timeout=5, range_bytes=32768):
+    """
+    用一次 Range 请求获取图片的类型、大小和宽高，只下载文件开头部分
+
+    Args:
+        session: HTTP 会话
+        url: 图片地址
+        timeout: 超时时间（秒）
+        range_bytes: 读取的最大字节数，足以覆盖常见图片的文件头
+
+    Returns:
+        dict: status、content_type、bytes、width、height，请求失败时只有 error
+    """
+    try:
+        with metrics.timer('image_probe'):
+            response = session.get(url, headers={'Range': f'bytes=0-{range_bytes - 1}'},
+                                   timeout=timeout, stream=True)
+            with response:
+                # 服务器不支持 Range 时会返回完整文件，同样只读取开头部分
+                data = b''
+                if response.status_code < 400:
+                    for chunk in response.iter_content(chunk_size=8192):
+                        data += chunk
+                        if len(data) >= range_bytes:
+                            break
+    except Exception as e:
+        metrics.incr('image_probe_errors')
+        return {'error': str(e)}
+
+    size = None
+    content_range = response.headers.get('Content-Range', '')
+    if '/' in content_range and content_range.rsplit('/', 1)[1].isdigit():
+        size = int(content_range.rsplit('/', 1)[1])
+    elif response.status_code == 200 and response.headers.get('Content-Length', '').isdigit():
+        size = int(response.headers['Content-Length'])
+
+    dimensions = parse_dimensions(data) if data else None
+    return {
+        'status': response.status_code,
+        'content_type': response.headers.get('Content-Type', '').split(';')[0].strip().lower(),
+        'bytes': size,
+        'width': dimensions[0] if dimensions else None,
+        'height': dimensions[1] if dimensions else None,
+    }
+
+def probe_images(urls, max_workers=8, timeout=5):
+    """
+    并发探测多张图片，共享一个连接池
+
+    Returns:
+        dict: URL -> probe_image 的结果
+    """
+    if not urls:
+        return {}
+    session = _create_session(max_workers)
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(lambda url: probe_image(session, url, timeout), urls)
+            return dict(zip(urls, results))
+    finally:
+        session.close()
+
+def _acceptable(info, min_dimension, min_bytes):
+    """根据探测结果判断图片是否可用：能访问、确实是图片且不是小图"""
+    if 'error' in info:
+        # 探测失败（超时、网络错误）不代表图片不可用，保留并由排序降低优先级
+        return True
+    if info['status'] >= 400:
+        return False
+    content_type = info['content_type']
+    if content_type in REJECTED_IMAGE_TYPES:
+        return False
+    # 从文件头解析出宽高即可确认是图片，不再看 Content-Type
+    if not (info['width'] and info['height']) and content_type \
+            and not content_type.startswith('image/') and content_type not in GENERIC_TYPES:
+        return False
+    if info['width'] and info['height'] and (info['width'] < min_dimension or info['height'] < min_dimension):
+        return False
+    if info['bytes'] is not None and info['bytes'] < min_bytes:
+        return False
+    return True
+
+def score_image(image, query_tokens=None):
+    """
+    图片排序分数：尺寸（对数面积）为主，alt 与查询词的相关性为辅
+
+    Args:
+        image: 图片信息，可能带有探测得到的 width、height、bytes
+        query_tokens: 查询词的词项集合
+
+    Returns:
+        float: 分数
+    """
+    score = 0.0
+    if image.get('width') and image.get('height'):
+        # 约 200x200 得 0 分，约 1600x1200 得 1 分
+        score += max(0.0, min(1.0, (math.log10(image['width'] * image['height']) - 4.6) / 1.68))
+    elif image.get('bytes'):
+        score += max(0.0, min(1.0, (math.log10(image['bytes']) - 4) / 2)) * 0.8
+    else:
+        score += 0.2
+
+    alt_tokens = set(tokenize(image.get('alt') or ''))
+    if query_tokens and alt_tokens:
+        score += len(alt_tokens & query_tokens) / len(query_tokens)
+    elif alt_tokens:
+        score += 0.1
+    return score
+
+def select_images(images, query=None, limit=3, probe=None, max_probes=20, min_dimension=200, min_bytes=5120):
+    """
+    从页面提取的图片中挑选最适合展示的几张
+
+    依次去重、按 URL/alt 过滤图标和追踪像素、并发探测类型/大小/宽高并过滤小图，最后按尺寸和 alt 相关性排序
+
+    Args:
+        images: extract_content 返回的 images 列表（{'url', 'alt'}）
+        query: 查询词（例如景点名称），用于计算 alt 相关性
+        limit: 最多返回的图片数
+        probe: 是否发起网络探测，None 表示使用 EnvConfig.image_probe
+        max_probes: 最多探测的图片数（按页面中出现的顺序）
+        min_dimension: 宽或高小于该值的图片会被丢弃
+        min_bytes: 小于该字节数的图片会被丢弃
+
+    Returns:
+        list: 选出的图片，包含 url、alt，以及探测得到的 width、height、bytes
+    """
+    if probe is None:
+        from lib.env import config
+        probe = config.image_probe
+
+    candidates = []
+    seen = set()
+    for image in images:
+        if not image.get('url'):
+            continue
+        key = _normalize_image_url(image['url'])
+        if key in seen:
+            continue
+        seen.add(key)
+        if not is_unwanted(image, min_dimension):
+            candidates.append({'url': image['url'], 'alt': image.get('alt') or ''})
+    metrics.incr('images_filtered', len(images) - len(candidates))
+    candidates = candidates[:max_probes]
+
+    if probe:
+        probes = probe_images([c['url'] for c in candidates])
+        kept = []
+        for candidate in candidates:
+            info = probes[candidate['url']]
+            if _acceptable(info, min_dimension, min_bytes):
+                candidate.update({k: info.get(k) for k in ('width', 'height', 'bytes')})
+                kept.append(candidate)
+        candidates = kept
+
+    query_tokens = set(tokenize(query)) if query else None
+    # 分数相同时保留页面中的原始顺序
+    ranked = sorted(enumerate(candidates), key=lambda item: (-score_image(item[1], query_tokens), item[0]))
+    return [candidate for _, candidate in ranked[:limit]]
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='从 URL 访问结果中挑选图片')
+    parser.add_argument('result_file', help='tools.web_access 保存的结果文件')
+    parser.add_argument('--query', help='查询词，用于计算 alt 相关性')
+    parser.add_argument('--limit', type=int, default=3, help='最多返回的图片数，默认3')
+    parser.add_argument('--no-probe', action='store_true', help='不发起网络探测，只按 URL 和 alt 过滤')
+    args = parser.parse_args()
+
+    from lib import storage
+    images = []
+    for result in storage.read_records(args.result_file)['results']:
+        images.extend(result['content']['images'])
+    selected = select_images(images, query=args.query, limit=args.limit, probe=not args.no_probe)
+    print(json.dumps(selected, ensure_ascii=False, indent=2))
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+import math
+import re
+from collections import Counter
+from urllib.parse import urlparse
+
+# 来源权威性表（参见 .cursorrules：维基百科、百度百科等最权威）
+# 按域名后缀匹配，取最长匹配项
+DOMAIN_AUTHORITY = {
+    'wikipedia.org': 1.0,
+    'baike.baidu.com': 1.0,
+    'baike.sogou.com': 0.8,
+    'baike.so.com': 0.8,
+    'gov.cn': 0.8,
+    'ctrip.com': 0.6,
+    'mafengwo.cn': 0.6,
+    'qunar.com': 0.6,
+    'tripadvisor.cn': 0.6,
+    'tripadvisor.com': 0.6,
+    'dianping.com': 0.5,
+    'sohu.com': 0.3,
+    'zhihu.com': 0.3,
+}
+
+_CJK_RE = re.compile(r'[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+')
+_WORD_RE = re.compile(r'[a-z0-9]+')
+
+def tokenize(text):
+    """
+    分词：中文按字符二元组切分，英文和数字按单词切分
+
+    Args:
+        text: 待分词的文本
+
+    Returns:
+        list: 词项列表
+    """
+    if not text:
+        return []
+    text = text.lower()
+    tokens = _WORD_RE.findall(text)
+    for run in _CJK_RE.findall(text):
+        if len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+def domain_authority(url, table=None):
+    """根据域名返回来源权威性分数（0~1），未知域名返回0"""
+    table = DOMAIN_AUTHORITY if table is None else table
+    host = (urlparse(url).hostname or '').lower()
+    best_suffix = ''
+    for suffix in table:
+        if (host == suffix or host.endswith('.' + suffix)) and len(suffix) > len(best_suffix):
+            best_suffix = suffix
+    return table.get(best_suffix, 0.0)
+
+class SearchResultRanker:
+    """本地搜索结果排序器，综合 BM25、查询词覆盖率和来源权威性打分"""
+
+    def __init__(self, authority=None, k1=1.5, b=0.75,
+                 bm25_weight=0.5, coverage_weight=0.3, authority_weight=0.2):
+        """
+        初始化排序器
+
+        Args:
+            authority: 域名权威性表，默认使用 DOMAIN_AUTHORITY
+            k1: BM25 词频饱和参数
+            b: BM25 文档长度归一化参数
+            bm25_weight: BM25 分数权重
+            coverage_weight: 查询词覆盖率权重
+            authority_weight: 来源权威性权重
+        """
+        self.authority = DOMAIN_AUTHORITY if authority is None else authority
+        self.k1 = k1
+        self.b = b
+        self.bm25_weight = bm25_weight
+        self.coverage_weight = coverage_weight
+        self.authority_weight = authority_weight
+
+    def _bm25_scores(self, query_terms, docs):
+        """计算每个文档的 BM25 分数"""
+        n = len(docs)
+        avg_len = sum(len(doc) for doc in docs) / n or 1
+        doc_freq = Counter()
+        for doc in docs:
+            doc_freq.update(set(doc))
+
+        scores = []
+        for doc in docs:
+            tf = Counter(doc)
+            norm = self.k1 * (1 - self.b + self.b * len(doc) / avg_len)
+            score = 0.0
+            for term in query_terms:
+                if not tf[term]:
+                    continue
+                idf = math.log(1 + (n - doc_freq[term] + 0.5) / (doc_freq[term] + 0.5))
+                score += idf * tf[term] * (self.k1 + 1) / (tf[term] + norm)
+            scores.append(score)
+        return scores
+
+    def rank(self, query, results):
+        """
+        对搜索结果打分并按分数从高到低排序
+
+        Args:
+            query: 查询文本（通常是景点名称）
+            results: 搜索结果列表，每项包含 title、link、snippet
+
+        Returns:
+            list: 排序后的结果，每项为原结果附加 score 字段的新字典
+        """
+        results = [r for r in results if r.get('link', '').startswith('http')]
+        if not results:
+            return []
+
+        query_terms = list(dict.fromkeys(tokenize(query)))
+        docs = [tokenize(f"{r.get('title', '')} {r.get('snippet', '')}") for r in results]
+        bm25 = self._bm25_scores(query_terms, docs)
+        max_bm25 = max(bm25) or 1.0
+
+        ranked = []
+        for result, doc, raw_bm25 in zip(results, docs, bm25):
+            doc_terms = set(doc)
+            coverage = (sum(1 for t in query_terms if t in doc_terms) / len(query_terms)) if query_terms else 0.0
+            score = (self.bm25_weight * raw_bm25 / max_bm25
+                     + self.coverage_weight * coverage
+                     + self.authority_weight * domain_authority(result['link'], self.authority))
+            ranked.append({**result, 'score': round(score, 6)})
+
+        # sorted 是稳定排序，同分时保留搜索引擎原有顺序
+        return sorted(ranked, key=lambda r: r['score'], reverse=True)
+
+    def select(self, query, results, top_n=3, tie_margin=0.05):
+        """
+        选出最相关的 URL，并判断是否存在需要进一步裁决的接近分数
+
+        Args:
+            query: 查询文本
+            results: 搜索结果列表
+            top_n: 选取的 URL 数量
+            tie_margin: 第 top_n 名与之后结果分差小于该值时视为并列
+
+        Returns:
+            tuple: (选中的URL列表, 并列候选结果列表)，无并列时候选列表为空
+        """
+        ranked = self.rank(query, results)
+        selected = [r['link'] for r in ranked[:top_n]]
+        if len(ranked) <= top_n:
+            return selected, []
+
+        cutoff = ranked[top_n - 1]['score']
+        contested = [r for r in ranked if abs(r['score'] - cutoff) < tie_margin]
+        if len(contested) <= 1 or all(r['link'] in selected for r in contested):
+            return selected, []
+        return selected, contested
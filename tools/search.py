@@ -1,71 +1,84 @@
 #!/usr/bin/env python3
-import sys
 import json
 import os
-import time
+import argparse
 from datetime import datetime
-from duckduckgo_search import DDGS
-from requests.exceptions import RequestException
+from lib.env import config
+from lib.metrics import metrics
+from lib import storage
+from lib.retry import retry_call, classify, RATE_LIMITED
+
+def _load_ddgs():
+    """延迟导入 duckduckgo_search，它会连带导入 primp 等较慢的依赖"""
+    from duckduckgo_search import DDGS
+    return DDGS
 
 class DuckDuckGoSearcher:
-    def __init__(self, output_dir='cache/search_results'):
+    def __init__(self, output_dir='cache/search_results', ddgs_factory=None):
+        """
+        Args:
+            output_dir: 搜索结果保存目录
+            ddgs_factory: 创建 DDGS 客户端的可调用对象，默认使用 duckduckgo_search.DDGS
+        """
         self.output_dir = output_dir
+        self.ddgs_factory = ddgs_factory
         if not os.path.exists(self.output_dir):
             os.makedirs(self.output_dir)
 
-    def search(self, query, max_retries=3, retry_delay=5):
-        for attempt in range(max_retries):
+    def _search_once(self, query):
+        """执行一次搜索，失败时抛出异常，由 retry_call 决定是否重试"""
+        ddgs_factory = self.ddgs_factory or _load_ddgs()
+        with ddgs_factory() as ddgs:
             try:
-                with DDGS() as ddgs:
-                    if attempt > 0:
-                        print(f"Retry attempt {attempt + 1}/{max_retries}, waiting {retry_delay} seconds...")
-                        time.sleep(retry_delay)
-                    
-                    try:
-                        results = list(ddgs.text(query, max_results=10))
-                    except Exception as e:
-                        if "rate limit" in str(e).lower():
-                            print(f"Rate limit hit, waiting longer ({retry_delay * 2} seconds) before retry...")
-                            time.sleep(retry_delay * 2)
-                            continue
-                        raise e
-                
-                if not results:
-                    return json.dumps({"error": "No results found."})
-                
-                formatted_results = {
-                    "query": query,
-                    "results": [
-                        {
-                            "title": result.get("title", ""),
-                            "link": result.get("href", ""),
-                            "snippet": result.get("body", "")
-                        }
-                        for result in results
-                    ]
-                }
-                
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = f"{self.output_dir}/{timestamp}.json"
-                
-                with open(filename, 'w', encoding='utf-8') as f:
-                    json.dump(formatted_results, f, ensure_ascii=False, indent=2)
-                
-                print(f"Search results saved to: {filename}")
-                return
-                    
+                with metrics.timer('ddg_search', query=query):
+                    return list(ddgs.text(query, max_results=10))
             except Exception as e:
-                if attempt == max_retries - 1:
-                    print(json.dumps({"error": f"Failed after {max_retries} attempts. Last error: {str(e)}"}))
-                else:
-                    print(f"Error occurred: {str(e)}")
-                    print(f"Retrying in {retry_delay} seconds...")
-                    time.sleep(retry_delay)
+                metrics.incr('ddg_search_errors')
+                if classify(e) == RATE_LIMITED:
+                    metrics.incr('ddg_rate_limited')
+                raise
+
+    def search(self, query, max_retries=3, retry_delay=5):
+        try:
+            # 限流时至少等待 retry_delay 的两倍；DDG 持续失败时熔断，后续搜索直接失败而不再等待
+            results = retry_call(self._search_once, query, endpoint='duckduckgo', max_attempts=max_retries,
+                                 base_delay=retry_delay, rate_limit_delay=retry_delay * 2)
+        except Exception as e:
+            print(json.dumps({"error": f"Search failed. Last error: {str(e)}"}))
+            return None
+        
+        if not results:
+            return json.dumps({"error": "No results found."})
+        
+        formatted_results = [
+            {
+                "title": result.get("title", ""),
+                "link": result.get("href", ""),
+                "snippet": result.get("body", "")
+            }
+            for result in results
+        ]
+        
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = storage.write_records(
+            self.output_dir, timestamp, {"query": query}, formatted_results, config.cache_format
+        )
+        storage.apply_retention(self.output_dir, config.cache_max_age_days, config.cache_max_mb, keep=filename)
+        
+        print(f"Search results saved to: {filename}")
+        return filename
 
 if __name__ == '__main__':
-    if len(sys.argv) < 2:
-        print("Usage: python3 search.py <query>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description='使用 DuckDuckGo 搜索并保存结果')
+    parser.add_argument('query', help='搜索关键词')
+    parser.add_argument('--no-daemon', action='store_true', help='不使用本地常驻服务，直接在当前进程中搜索')
+    args = parser.parse_args()
     
-    searcher = DuckDuckGoSearcher()
-    searcher.search(sys.argv[1])
+    # 本地常驻服务运行时转发给它，复用其中的 DDG 客户端和搜索缓存
+    from tools import daemon
+    response = None if args.no_daemon else daemon.forward('/search', {'query': args.query})
+    if response is not None:
+        daemon.print_response(response)
+    else:
+        searcher = DuckDuckGoSearcher()
+        searcher.search(args.query)
@@ -1,35 +1,89 @@
 #!/usr/bin/env python3
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-from webdriver_manager.core.os_manager import ChromeType
-from bs4 import BeautifulSoup
+# selenium、webdriver_manager 和 bs4 导入较慢，在首次使用时才导入，保证 --help 等路径快速返回
 from urllib.parse import urljoin, urlparse
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor
 from lib.env import config
+from lib.metrics import metrics
+from lib.concurrency import AdaptiveConcurrency
+from lib import sysinfo
+from lib import storage
+from lib.retry import retry_call, record_outcome, endpoint_for_url
+from collections import deque
 import concurrent.futures
 import threading
 import argparse
 import time
-import json
 import sys
 import os
 
+# 在浏览器内提取正文、图片和链接的脚本，语义与 extract_content 对 HTML 的处理一致：
+# 跳过 script/style/noscript 中的文本，按 Python str.strip() 的空白字符集去除首尾空白，
+# 只返回原始属性值，URL 的绝对化和数量限制仍由 Python 端完成。
+# 每类数据最多多返回一项，用于让 Python 端判断是否截断。
+DOM_EXTRACT_SCRIPT = """
+var maxTextChars = arguments[0], maxImages = arguments[1], maxLinks = arguments[2];
+var WS = '[\\t\\n\\v\\f\\r \\x1c-\\x1f\\x85\\xa0\\u1680\\u2000-\\u200a\\u2028\\u2029\\u202f\\u205f\\u3000]+';
+var TRIM = new RegExp('^' + WS + '|' + WS + '$', 'g');
+function skipped(node) {
+  for (var el = node.parentNode; el; el = el.parentNode) {
+    if (el.nodeName === 'SCRIPT' || el.nodeName === 'STYLE' || el.nodeName === 'NOSCRIPT') return true;
+  }
+  return false;
+}
+function strippedStrings(root, limit) {
+  var result = [], length = 0;
+  var walker = document.createTreeWalker(root, NodeFilter.SHOW_TEXT);
+  while (walker.nextNode()) {
+    var node = walker.currentNode;
+    if (skipped(node)) continue;
+    var text = node.data.replace(TRIM, '');
+    if (!text) continue;
+    result.push(text);
+    length += text.length + 1;
+    if (limit && length > limit + 1) break;
+  }
+  return result;
+}
+var images = [], links = [];
+var imgs = document.getElementsByTagName('img');
+for (var i = 0; i < imgs.length && !(maxImages && images.length > maxImages); i++) {
+  var src = imgs[i].getAttribute('src');
+  if (src) images.push([src, imgs[i].getAttribute('alt') || '']);
+}
+var anchors = document.getElementsByTagName('a');
+for (var j = 0; j < anchors.length && !(maxLinks && links.length > maxLinks); j++) {
+  var href = anchors[j].getAttribute('href');
+  var linkText = strippedStrings(anchors[j], 0).join('');
+  if (href && linkText) links.push([href, linkText]);
+}
+var root = document.documentElement;
+return {
+  strings: root ? strippedStrings(root, maxTextChars) : [],
+  images: images,
+  links: links
+};
+"""
+
 class ChromeDriver:
     """Chrome 浏览器驱动的封装类"""
     
-    def __init__(self):
+    def __init__(self, page_load_strategy='normal', reused=False):
         """
         初始化 Chrome 驱动
         
         Args:
-            chromium_path: Chromium 浏览器的安装路径
+            page_load_strategy: 页面加载策略，多标签页模式使用 none 使导航立即返回
+            reused: 浏览器是否在多次抓取之间复用（例如常驻服务的浏览器池），
+                复用时每次抓取后检查内存；每个URL新建浏览器时无需检查
         """
         self.chromium_path = config.chrome_path
+        self.page_load_strategy = page_load_strategy
+        self.reused = reused
 
         self.driver = None
+        # 最近一次获取的页面 HTML 是否因超过 max_html_chars 被截断
+        self.last_truncated = False
     
     def _create_options(self):
         """
@@ -38,6 +92,8 @@ class ChromeDriver:
         Returns:
             Options: 配置好的 Chrome 选项
         """
+        from selenium.webdriver.chrome.options import Options
+        
         chrome_options = Options()
         chrome_options.add_argument('--headless')  # 无界面模式
         chrome_options.add_argument('--disable-gpu')
@@ -53,6 +109,7 @@ class ChromeDriver:
         chrome_options.add_argument('--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36')
         
         chrome_options.binary_location = self.chromium_path
+        chrome_options.page_load_strategy = self.page_load_strategy
         
         return chrome_options
     
@@ -63,9 +120,16 @@ class ChromeDriver:
         Returns:
             webdriver.Chrome: 配置好的 Chrome 驱动实例
         """
-        options = self._create_options()
-        service = Service(ChromeDriverManager(chrome_type=ChromeType.CHROMIUM).install())
-        self.driver = webdriver.Chrome(service=service, options=options)
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+        from webdriver_manager.chrome import ChromeDriverManager
+        from webdriver_manager.core.os_manager import ChromeType
+        
+        with metrics.timer('chrome_create_driver'):
+            options = self._create_options()
+            service = Service(ChromeDriverManager(chrome_type=ChromeType.CHROMIUM).install())
+            self.driver = webdriver.Chrome(service=service, options=options)
+        metrics.incr('chrome_sessions_started')
         return self.driver
     
     def quit(self):
@@ -74,6 +138,16 @@ class ChromeDriver:
             self.driver.quit()
             self.driver = None
     
+    def _load(self, url, wait_time):
+        """打开网页并等待加载，返回当前URL（可能经过重定向）"""
+        if not self.driver:
+            self.create_driver()
+        
+        with metrics.timer('chrome_page_load', url=url):
+            self.driver.get(url)
+            time.sleep(wait_time)  # 等待页面加载
+        return self.driver.current_url
+    
     def get_page_content(self, url, wait_time=2):
         """
         获取网页内容
@@ -89,23 +163,228 @@ class ChromeDriver:
             Exception: 当获取页面失败时抛出异常
         """
         try:
-            if not self.driver:
-                self.create_driver()
-            
-            # 打开网页
-            self.driver.get(url)
-            time.sleep(wait_time)  # 等待页面加载
+            current_url = self._load(url, wait_time)
             
             # 获取页面内容
-            page_source = self.driver.page_source
-            current_url = self.driver.current_url  # 获取当前页面的URL（可能经过重定向）
+            with metrics.timer('chrome_page_source', url=url):
+                page_source, self.last_truncated = self._read_page_source()
+            metrics.incr('chrome_pages_loaded')
+            if self.last_truncated:
+                metrics.incr('chrome_pages_truncated')
+                print(f"[DEBUG] 页面过大，HTML 已截断到 {config.max_html_chars} 字符: {url}", file=sys.stderr)
             
+            self._check_memory()
             return page_source, current_url
             
         except Exception as e:
+            metrics.incr('chrome_page_errors')
+            self.quit()
+            raise
+    
+    def get_page_dom(self, url, wait_time=2):
+        """
+        在浏览器内直接提取页面的文本、图片和链接，不传回完整 HTML
+        
+        Args:
+            url: 要访问的网页URL
+            wait_time: 等待页面加载的时间（秒）
+            
+        Returns:
+            tuple: (DOM_EXTRACT_SCRIPT 返回的原始数据, 当前URL)，可交给 extract_dom_content 处理
+            
+        Raises:
+            Exception: 当获取页面失败时抛出异常
+        """
+        try:
+            current_url = self._load(url, wait_time)
+            
+            with metrics.timer('chrome_dom_extract', url=url):
+                dom_data = self.driver.execute_script(
+                    DOM_EXTRACT_SCRIPT, config.max_text_chars, config.max_images, config.max_links
+                )
+            self.last_truncated = False
+            metrics.incr('chrome_pages_loaded')
+            
+            self._check_memory()
+            return dom_data, current_url
+            
+        except Exception as e:
+            metrics.incr('chrome_page_errors')
             self.quit()
             raise
     
+    def _extract_current_page(self, extract_mode):
+        """在当前标签页中提取内容，返回与 extract_content 相同格式的结果"""
+        current_url = self.driver.current_url
+        if extract_mode == 'dom':
+            with metrics.timer('chrome_dom_extract', url=current_url):
+                dom_data = self.driver.execute_script(
+                    DOM_EXTRACT_SCRIPT, config.max_text_chars, config.max_images, config.max_links
+                )
+            return extract_dom_content(dom_data, current_url)
+        
+        with metrics.timer('chrome_page_source', url=current_url):
+            page_source, html_truncated = self._read_page_source()
+        content = extract_content(page_source, current_url)
+        content['truncated'] = content['truncated'] or html_truncated
+        return content
+    
+    def get_pages_content(self, urls, tabs=5, wait_time=2, page_timeout=30, extract_mode=None, poll_interval=0.2):
+        """
+        在同一个浏览器的多个标签页中并行加载页面，哪个页面先加载完成就先提取哪个
+        
+        需要以 page_load_strategy='none' 创建驱动，否则每次导航都会阻塞到页面加载完成。
+        
+        Args:
+            urls: 要访问的URL列表
+            tabs: 同时打开的标签页数量
+            wait_time: 页面加载完成（readyState 为 complete）后额外等待的时间（秒）
+            page_timeout: 单个页面的最长等待时间（秒），超时后直接提取已加载的内容
+            extract_mode: 内容提取方式 html/dom，默认使用 EnvConfig.extract_mode
+            poll_interval: 没有页面就绪时的轮询间隔（秒）
+            
+        Yields:
+            tuple: (URL, 提取的内容, 异常)，成功时异常为 None，失败时内容为 None
+        """
+        extract_mode = extract_mode or config.extract_mode
+        pending = deque(urls)
+        
+        try:
+            while pending:
+                if not self.driver:
+                    self.create_driver()
+                # 复用上次调用留下的标签页，不足时再新建
+                count = min(tabs, len(pending))
+                handles = self.driver.window_handles[:count]
+                while len(handles) < count:
+                    self.driver.switch_to.new_window('tab')
+                    handles.append(self.driver.current_window_handle)
+                
+                # 每个标签页的状态：(URL, 开始时间, 首次检测到加载完成的时间)
+                active = {}
+                recycle = False
+                
+                def assign(handle):
+                    """
+                    为空闲标签页分配下一个URL；导航失败时产出失败结果并关闭该标签页，
+                    不再向其分配URL，剩余URL由其他标签页继续处理
+                    """
+                    if not pending:
+                        return
+                    url = pending.popleft()
+                    try:
+                        self.driver.switch_to.window(handle)
+                        self.driver.get(url)  # 加载策略为 none 时立即返回
+                        active[handle] = (url, time.monotonic(), None)
+                    except Exception as e:
+                        metrics.incr('chrome_page_errors')
+                        yield url, None, e
+                        handles.remove(handle)
+                        # 关闭最后一个窗口会结束浏览器会话，因此至少保留一个标签页
+                        if handles:
+                            try:
+                                self.driver.close()
+                                self.driver.switch_to.window(handles[0])
+                            except Exception:
+                                pass  # 标签页已崩溃或浏览器已退出
+                
+                for handle in list(handles):
+                    yield from assign(handle)
+                
+                while active:
+                    progressed = False
+                    for handle in list(active):
+                        url, started, completed = active[handle]
+                        now = time.monotonic()
+                        try:
+                            self.driver.switch_to.window(handle)
+                            if completed is None:
+                                try:
+                                    ready = self.driver.execute_script('return document.readyState') == 'complete'
+                                except Exception:
+                                    ready = False  # 页面正在跳转，执行上下文尚不可用
+                                if ready:
+                                    completed = now
+                                    active[handle] = (url, started, completed)
+                            if not ((completed is not None and now - completed >= wait_time)
+                                    or now - started >= page_timeout):
+                                continue
+                            
+                            content = self._extract_current_page(extract_mode)
+                            metrics.observe('chrome_tab_page_load', now - started)
+                            metrics.incr('chrome_pages_loaded')
+                            yield url, content, None
+                        except Exception as e:
+                            metrics.incr('chrome_page_errors')
+                            yield url, None, e
+                        
+                        progressed = True
+                        del active[handle]
+                        if not recycle and config.max_browser_rss_mb:
+                            rss_mb = sysinfo.process_tree_rss_mb(self.driver.service.process.pid)
+                            recycle = rss_mb is not None and rss_mb > config.max_browser_rss_mb
+                            if recycle:
+                                print(f"[DEBUG] 浏览器内存 {rss_mb:.0f}MB 超过上限 {config.max_browser_rss_mb}MB，"
+                                      f"等待在途页面完成后回收浏览器", file=sys.stderr)
+                        if not recycle:
+                            yield from assign(handle)
+                    
+                    if not progressed:
+                        time.sleep(poll_interval)
+                
+                if recycle:
+                    metrics.incr('chrome_sessions_recycled')
+                    self.quit()
+                elif pending:
+                    # 所有标签页都因导航失败被关闭，重建浏览器后继续处理剩余URL
+                    print(f"[DEBUG] 所有标签页导航失败，重建浏览器处理剩余 {len(pending)} 个URL", file=sys.stderr)
+                    self.quit()
+        finally:
+            self._release_tabs()
+    
+    def _release_tabs(self):
+        """只保留一个标签页并切换到空白页，避免复用的浏览器中积累标签页和已加载的页面"""
+        if not self.driver:
+            return
+        try:
+            handles = self.driver.window_handles
+            for handle in handles[1:]:
+                self.driver.switch_to.window(handle)
+                self.driver.close()
+            self.driver.switch_to.window(handles[0])
+            self.driver.get('about:blank')
+        except Exception:
+            # 浏览器状态异常时直接关闭，下次使用时重建
+            self.quit()
+    
+    def _read_page_source(self):
+        """
+        获取页面 HTML，超过 max_html_chars 时在浏览器内截断后再传回
+        
+        Returns:
+            tuple: (页面源代码, 是否被截断)
+        """
+        max_chars = config.max_html_chars
+        if not max_chars:
+            return self.driver.page_source, False
+        
+        html, truncated = self.driver.execute_script(
+            "var html = document.documentElement ? document.documentElement.outerHTML : '';"
+            "return html.length > arguments[0] ? [html.substring(0, arguments[0]), true] : [html, false];",
+            max_chars
+        )
+        return html, truncated
+    
+    def _check_memory(self):
+        """复用的浏览器内存超过 max_browser_rss_mb 时关闭浏览器，下次使用时自动重建"""
+        if not self.reused or not config.max_browser_rss_mb or not self.driver:
+            return
+        rss_mb = sysinfo.process_tree_rss_mb(self.driver.service.process.pid)
+        if rss_mb is not None and rss_mb > config.max_browser_rss_mb:
+            print(f"[DEBUG] 浏览器内存 {rss_mb:.0f}MB 超过上限 {config.max_browser_rss_mb}MB，回收浏览器", file=sys.stderr)
+            metrics.incr('chrome_sessions_recycled')
+            self.quit()
+    
     def __enter__(self):
         """上下文管理器入口"""
         self.create_driver()
@@ -148,15 +427,9 @@ class FileHandler:
         if timestamp is None:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         
-        filename = f"{timestamp}.json"
-        filepath = os.path.join(self.base_dir, filename)
-        
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump({
-                'timestamp': timestamp,
-                'total_urls': len(results),
-                'results': results
-            }, f, ensure_ascii=False, indent=2)
+        header = {'timestamp': timestamp, 'total_urls': len(results)}
+        filepath = storage.write_records(self.base_dir, timestamp, header, results, config.cache_format)
+        storage.apply_retention(self.base_dir, config.cache_max_age_days, config.cache_max_mb, keep=filepath)
         
         return filepath
 
@@ -167,17 +440,82 @@ class ResultCollector:
         self.results = []
         self.lock = threading.Lock()
         self.file_handler = FileHandler()
+        # 最近一次保存的文件路径
+        self.output_file = None
     
-    def add_result(self, url, content):
+    def add_result(self, url, content, **extra):
         with self.lock:
             self.results.append({
                 'url': url,
                 'timestamp': datetime.now().strftime('%Y%m%d_%H%M%S'),
-                'content': content
+                'content': content,
+                **extra
             })
     
     def save_to_file(self):
-        return self.file_handler.save_results(self.results)
+        self.output_file = self.file_handler.save_results(self.results)
+        return self.output_file
+
+class SpeculativeFetcher:
+    """推测性预取器：在 LLM 裁决并列候选的同时提前抓取候选页面，最终只采用被选中的结果"""
+    
+    def __init__(self, max_workers=3, extract_mode=None):
+        """
+        初始化预取器
+        
+        Args:
+            max_workers: 最大并发数，超出的候选排队等待，未被选中时可以取消
+            extract_mode: 内容提取方式 html/dom，None 表示使用 EnvConfig.extract_mode
+        """
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.extract_mode = extract_mode
+        self.prefetched = ResultCollector()
+        self.futures = {}
+    
+    def prefetch(self, urls):
+        """按顺序提交尚未抓取的URL，立即返回；抓取经过 process_single_url，同样会重试和熔断"""
+        for url in urls:
+            if url not in self.futures:
+                self.futures[url] = self.executor.submit(process_single_url, url, self.prefetched, self.extract_mode)
+    
+    def collect(self, urls):
+        """
+        等待选中URL的抓取结果，取消其余尚未开始的预取任务
+        
+        Args:
+            urls: 最终选中的URL列表，未预取的URL会在此时补充抓取
+            
+        Returns:
+            tuple: (结果文件路径, 与结果文件内容相同的字典)
+        """
+        self.prefetch(urls)
+        for url, future in self.futures.items():
+            if url not in urls and future.cancel():
+                print(f"Cancelled prefetch of {url}")
+        
+        for url in urls:
+            print(self.futures[url].result())
+        
+        # 只保存选中的URL，顺序与 urls 一致
+        by_url = {result['url']: result for result in self.prefetched.results}
+        collector = ResultCollector()
+        collector.results = [by_url[url] for url in urls if url in by_url]
+        output_file = collector.save_to_file()
+        print(f"\nAll results saved to: {output_file}")
+        return output_file, {
+            'total_urls': len(collector.results),
+            'results': collector.results
+        }
+    
+    def shutdown(self):
+        """取消排队中的预取任务，并等待已启动的任务结束，避免浏览器在调用方结束后继续运行"""
+        self.executor.shutdown(wait=True, cancel_futures=True)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
 
 def convert_to_absolute_url(base_url, relative_url):
     """将相对URL转换为绝对URL"""
@@ -192,72 +530,214 @@ def convert_to_absolute_url(base_url, relative_url):
         return f"{parsed_base.scheme}://{parsed_base.netloc}{relative_url}"
     return urljoin(base_url, relative_url)
 
-def extract_content(html, base_url):
-    """从HTML中提取内容，包括文本、图片和链接"""
-    soup = BeautifulSoup(html, 'html.parser')
+def _build_content(strings, raw_images, raw_links, base_url, max_text_chars=None, max_images=None, max_links=None):
+    """
+    将文本片段、图片和链接的原始属性整理为统一的结果格式
     
-    # 提取所有文本，去除脚本和样式内容
-    for script in soup(['script', 'style']):
-        script.decompose()
-    text = ' '.join(soup.stripped_strings)
+    Args:
+        strings: 去除首尾空白后的非空文本片段
+        raw_images: (src, alt) 序列
+        raw_links: (href, 链接文本) 序列
+        base_url: 用于转换相对URL的页面地址
+        max_text_chars: 正文最大字符数，默认使用 EnvConfig.max_text_chars（0 表示不限制）
+        max_images: 最大图片数，默认使用 EnvConfig.max_images
+        max_links: 最大链接数，默认使用 EnvConfig.max_links
+        
+    Returns:
+        dict: 包含 text、images、links，以及内容是否因超出限制被截断的 truncated 标记
+    """
+    max_text_chars = config.max_text_chars if max_text_chars is None else max_text_chars
+    max_images = config.max_images if max_images is None else max_images
+    max_links = config.max_links if max_links is None else max_links
+    truncated = False
+    
+    # 累计到字符上限后停止遍历，避免为超大页面拼接完整文本
+    texts = []
+    length = 0
+    for string in strings:
+        if max_text_chars and length + len(string) > max_text_chars:
+            if max_text_chars > length:
+                texts.append(string[:max_text_chars - length])
+            truncated = True
+            break
+        texts.append(string)
+        length += len(string) + 1
+    text = ' '.join(texts)
     
     # 提取图片
     images = []
-    for img in soup.find_all('img'):
-        src = img.get('src')
-        alt = img.get('alt', '')
-        if src:
-            absolute_src = convert_to_absolute_url(base_url, src)
-            if absolute_src:
-                images.append({
-                    'url': absolute_src,
-                    'alt': alt
-                })
+    for src, alt in raw_images:
+        if not src:
+            continue
+        if max_images and len(images) >= max_images:
+            truncated = True
+            break
+        absolute_src = convert_to_absolute_url(base_url, src)
+        if absolute_src:
+            images.append({
+                'url': absolute_src,
+                'alt': alt
+            })
     
     # 提取链接
     links = []
-    for a in soup.find_all('a'):
-        href = a.get('href')
-        link_text = a.get_text(strip=True)
-        if href and link_text:
-            absolute_href = convert_to_absolute_url(base_url, href)
-            if absolute_href:
-                links.append({
-                    'url': absolute_href,
-                    'text': link_text
-                })
+    for href, link_text in raw_links:
+        if not (href and link_text):
+            continue
+        if max_links and len(links) >= max_links:
+            truncated = True
+            break
+        absolute_href = convert_to_absolute_url(base_url, href)
+        if absolute_href:
+            links.append({
+                'url': absolute_href,
+                'text': link_text
+            })
     
     return {
         'text': text,
         'images': images,
-        'links': links
+        'links': links,
+        'truncated': truncated
     }
 
-def get_webpage_content(url):
-    """获取网页内容的主函数"""
+@metrics.timed('extract_content')
+def extract_content(html, base_url, max_text_chars=None, max_images=None, max_links=None):
+    """
+    从HTML中提取内容，包括文本、图片和链接
+    
+    Args:
+        html: 页面源代码
+        base_url: 用于转换相对URL的页面地址
+        max_text_chars: 正文最大字符数，默认使用 EnvConfig.max_text_chars（0 表示不限制）
+        max_images: 最大图片数，默认使用 EnvConfig.max_images
+        max_links: 最大链接数，默认使用 EnvConfig.max_links
+        
+    Returns:
+        dict: 包含 text、images、links，以及内容是否因超出限制被截断的 truncated 标记
+    """
+    from bs4 import BeautifulSoup
+    
+    with metrics.timer('extract_parse_html'):
+        soup = BeautifulSoup(html, 'html.parser')
+    
+    # 提取所有文本，去除脚本和样式内容；启用 JS 的浏览器把 noscript 当作纯文本，
+    # 同样去除，保证与 DOM_EXTRACT_SCRIPT 的结果一致
+    for script in soup(['script', 'style', 'noscript']):
+        script.decompose()
+    
+    content = _build_content(
+        soup.stripped_strings,
+        ((img.get('src'), img.get('alt', '')) for img in soup.find_all('img')),
+        ((a.get('href'), a.get_text(strip=True)) for a in soup.find_all('a')),
+        base_url,
+        max_text_chars=max_text_chars,
+        max_images=max_images,
+        max_links=max_links
+    )
+    
+    # 尽早释放解析树
+    soup.decompose()
+    return content
+
+def extract_dom_content(dom_data, base_url, max_text_chars=None, max_images=None, max_links=None):
+    """
+    将 ChromeDriver.get_page_dom 的结果整理为与 extract_content 相同的格式
+    
+    Args:
+        dom_data: DOM_EXTRACT_SCRIPT 返回的原始数据
+        base_url: 用于转换相对URL的页面地址
+        
+    Returns:
+        dict: 与 extract_content 返回值格式相同
+    """
+    return _build_content(
+        dom_data['strings'],
+        dom_data['images'],
+        dom_data['links'],
+        base_url,
+        max_text_chars=max_text_chars,
+        max_images=max_images,
+        max_links=max_links
+    )
+
+def fetch_with_driver(driver, url, extract_mode=None, wait_time=2):
+    """
+    用已有的浏览器获取并提取网页内容，浏览器在完成后保持打开以便复用
+    
+    Args:
+        driver: ChromeDriver 实例
+        url: 要访问的网页URL
+        extract_mode: html 取回页面源代码后解析，dom 在浏览器内直接提取；默认使用 EnvConfig.extract_mode
+        wait_time: 等待页面加载的时间（秒）
+    """
+    extract_mode = extract_mode or config.extract_mode
+    if extract_mode == 'dom':
+        dom_data, current_url = driver.get_page_dom(url, wait_time=wait_time)
+        return extract_dom_content(dom_data, current_url)
+    page_source, current_url = driver.get_page_content(url, wait_time=wait_time)
+    content = extract_content(page_source, current_url)
+    content['truncated'] = content['truncated'] or driver.last_truncated
+    return content
+
+def get_webpage_content(url, extract_mode=None, wait_time=2):
+    """
+    获取网页内容的主函数
+    
+    Args:
+        url: 要访问的网页URL
+        extract_mode: html 取回页面源代码后解析，dom 在浏览器内直接提取；默认使用 EnvConfig.extract_mode
+        wait_time: 等待页面加载的时间（秒）
+    """
     try:
         with ChromeDriver() as driver:
-            page_source, current_url = driver.get_page_content(url)
-            content = extract_content(page_source, current_url)
-            return content
+            return fetch_with_driver(driver, url, extract_mode, wait_time)
     except Exception as e:
         print(f"Error fetching URL: {e}", file=sys.stderr)
         raise
 
-def process_single_url(url, collector):
-    """处理单个URL并收集结果"""
+def process_single_url(url, collector, extract_mode=None, max_attempts=2, wait_time=2):
+    """处理单个URL并收集结果，暂时性错误会重试，同一域名持续失败时熔断"""
     try:
-        content = get_webpage_content(url)
+        with metrics.timer('process_single_url', url=url):
+            content = retry_call(get_webpage_content, url, extract_mode=extract_mode, wait_time=wait_time,
+                                 endpoint=endpoint_for_url(url), max_attempts=max_attempts)
         collector.add_result(url, content)
+        metrics.incr('urls_succeeded')
         return f"Successfully processed {url}"
     except Exception as e:
+        metrics.incr('urls_failed')
         return f"Failed to process {url}: {str(e)}"
 
-def process_urls(urls, max_workers=5):
-    """并发处理多个URL"""
-    collector = ResultCollector()
+def process_urls(urls, max_workers=5, adaptive=None, extract_mode=None, tabs=None, collector=None, wait_time=2):
+    """
+    并发处理多个URL
+    
+    Args:
+        urls: 要访问的URL列表
+        max_workers: 固定并发数（多标签页模式下为浏览器数量），自适应模式下不使用
+        adaptive: 是否启用自适应并发，None 表示使用 EnvConfig.adaptive_workers
+        extract_mode: 内容提取方式 html/dom，None 表示使用 EnvConfig.extract_mode
+        tabs: 每个浏览器同时打开的标签页数量，None 表示使用 EnvConfig.tabs_per_browser，
+            大于1时启用多标签页模式（不与自适应并发同时使用）
+        collector: 结果收集器，默认新建一个；保存后可从 collector.output_file 取得结果文件路径
+        wait_time: 每个页面加载完成后的等待时间（秒）
+    """
+    if tabs is None:
+        tabs = config.tabs_per_browser
+    if tabs > 1:
+        return process_urls_multitab(urls, max_workers=max_workers, tabs=tabs, extract_mode=extract_mode,
+                                     collector=collector, wait_time=wait_time)
+    
+    if adaptive is None:
+        adaptive = config.adaptive_workers
+    if adaptive:
+        return process_urls_adaptive(urls, extract_mode=extract_mode, collector=collector, wait_time=wait_time)
+    
+    collector = collector or ResultCollector()
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_url = {executor.submit(process_single_url, url, collector): url for url in urls}
+        future_to_url = {executor.submit(process_single_url, url, collector, extract_mode, wait_time=wait_time): url
+                         for url in urls}
         results = []
         
         for future in concurrent.futures.as_completed(future_to_url):
@@ -274,12 +754,153 @@ def process_urls(urls, max_workers=5):
     print(f"\nAll results saved to: {output_file}")
     return results
 
+def _timed_process_single_url(url, collector, extract_mode=None, wait_time=2):
+    """处理单个URL，额外返回耗时供并发控制器使用"""
+    start = time.perf_counter()
+    result = process_single_url(url, collector, extract_mode, wait_time=wait_time)
+    return result, time.perf_counter() - start
+
+def process_urls_adaptive(urls, extract_mode=None, collector=None, wait_time=2):
+    """按 AIMD 策略动态调整同时运行的浏览器数量，并发处理多个URL"""
+    controller = AdaptiveConcurrency(
+        min_workers=config.min_workers,
+        max_workers=config.max_workers,
+        min_free_memory_mb=config.min_free_memory_mb
+    )
+    collector = collector or ResultCollector()
+    pending = deque(urls)
+    running = {}
+    results = []
+    
+    with ThreadPoolExecutor(max_workers=controller.max_workers) as executor:
+        while pending or running:
+            # 只在并发数未达到当前上限时提交新任务
+            while pending and len(running) < controller.limit:
+                url = pending.popleft()
+                running[executor.submit(_timed_process_single_url, url, collector, extract_mode, wait_time)] = url
+            
+            done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                url = running.pop(future)
+                try:
+                    result, elapsed = future.result()
+                    controller.record(elapsed, not result.startswith('Failed'))
+                    results.append(result)
+                    print(result)
+                except Exception as e:
+                    controller.record(0, False)
+                    results.append(f"Error processing {url}: {str(e)}")
+                    print(f"Error processing {url}: {str(e)}", file=sys.stderr)
+    
+    output_file = collector.save_to_file()
+    print(f"\nAll results saved to: {output_file}")
+    return results
+
+def _process_tab_group(urls, collector, tabs, extract_mode=None, wait_time=2):
+    """用一个浏览器的多个标签页处理一组URL"""
+    results = []
+    driver = ChromeDriver(page_load_strategy='none')
+    try:
+        for url, content, error in driver.get_pages_content(urls, tabs=tabs, wait_time=wait_time,
+                                                            extract_mode=extract_mode):
+            record_outcome(endpoint_for_url(url), error)
+            if error is None:
+                collector.add_result(url, content)
+                metrics.incr('urls_succeeded')
+                result = f"Successfully processed {url}"
+            else:
+                metrics.incr('urls_failed')
+                result = f"Failed to process {url}: {str(error)}"
+            results.append(result)
+            print(result)
+    finally:
+        driver.quit()
+    return results
+
+def process_urls_multitab(urls, max_workers=5, tabs=5, extract_mode=None, collector=None, wait_time=2):
+    """
+    多标签页模式：每个浏览器同时加载多个页面，减少 Chromium 进程数量
+    
+    Args:
+        urls: 要访问的URL列表
+        max_workers: 最多启动的浏览器数量
+        tabs: 每个浏览器同时打开的标签页数量
+        extract_mode: 内容提取方式 html/dom，None 表示使用 EnvConfig.extract_mode
+        collector: 结果收集器，默认新建一个
+        wait_time: 每个页面加载完成后的等待时间（秒）
+    """
+    collector = collector or ResultCollector()
+    browsers = max(1, min(max_workers, -(-len(urls) // tabs)))
+    groups = [urls[i::browsers] for i in range(browsers)]
+    results = []
+    
+    with ThreadPoolExecutor(max_workers=browsers) as executor:
+        future_to_group = {executor.submit(_process_tab_group, group, collector, tabs, extract_mode, wait_time): group
+                           for group in groups if group}
+        for future in concurrent.futures.as_completed(future_to_group):
+            try:
+                results.extend(future.result())
+            except Exception as e:
+                # 浏览器无法启动等整组失败的情况
+                for url in future_to_group[future]:
+                    results.append(f"Error processing {url}: {str(e)}")
+                print(f"Error processing {len(future_to_group[future])} URLs: {str(e)}", file=sys.stderr)
+    
+    output_file = collector.save_to_file()
+    print(f"\nAll results saved to: {output_file}")
+    return results
+
 if __name__ == '__main__':
     """命令行入口函数"""
     parser = argparse.ArgumentParser(description='获取网页内容的命令行工具')
     parser.add_argument('urls', nargs='+', help='要访问的URL列表')
-    parser.add_argument('--wait', type=float, default=2, help='每个页面加载等待时间（秒），默认2秒')
-    parser.add_argument('--workers', type=int, default=5, help='最大并发数，默认5')
+    parser.add_argument('--wait', type=float, help='每个页面加载等待时间（秒），默认2秒')
+    parser.add_argument('--workers', type=int, help='最大并发数，默认5')
+    parser.add_argument('--adaptive', action='store_true', default=None,
+                        help='根据延迟、错误率和系统资源自动调整并发数（范围由 MIN_WORKERS/MAX_WORKERS 配置）')
+    parser.add_argument('--extract-mode', choices=['html', 'dom'],
+                        help='内容提取方式：html 取回页面源代码后解析，dom 在浏览器内直接提取，默认使用 EXTRACT_MODE 配置')
+    parser.add_argument('--tabs', type=int, help='每个浏览器同时打开的标签页数量，大于1时启用多标签页模式，默认使用 TABS_PER_BROWSER 配置')
+    parser.add_argument('--no-daemon', action='store_true', help='不使用本地常驻服务，直接在当前进程中抓取')
+    crawl_group = parser.add_argument_group('爬取模式', '指定 --depth 大于0时，从给定URL出发沿页面链接继续抓取')
+    crawl_group.add_argument('--depth', type=int, default=0, help='最大链接深度，默认0（只抓取给定URL）')
+    crawl_group.add_argument('--max-pages', type=int, default=50, help='最多抓取的页面数，默认50')
+    crawl_group.add_argument('--any-domain', action='store_true', help='允许抓取与种子URL不同域名的页面')
+    crawl_group.add_argument('--allow-domain', action='append', default=[], help='额外允许的域名，可多次指定')
+    crawl_group.add_argument('--include', action='append', default=[], help='URL 需匹配的正则表达式，可多次指定')
+    crawl_group.add_argument('--exclude', action='append', default=[], help='需跳过的URL正则表达式，可多次指定')
     args = parser.parse_args()
     
-    process_urls(args.urls, max_workers=args.workers)
\ No newline at end of file
+    # 本地常驻服务运行时转发给它，复用其中预热的浏览器和页面缓存；
+    # 常驻服务按自身配置抓取，指定了并发相关参数时直接在当前进程中抓取
+    concurrency_options = (args.wait, args.workers, args.adaptive, args.tabs)
+    use_daemon = not args.no_daemon and args.depth == 0 and all(o is None for o in concurrency_options)
+    args.workers = args.workers or 5
+    args.wait = 2 if args.wait is None else args.wait
+    from tools import daemon
+    response = None
+    if use_daemon:
+        response = daemon.forward('/fetch', {'urls': args.urls, 'extract_mode': args.extract_mode})
+    
+    if response is not None:
+        daemon.print_response(response)
+    elif args.depth > 0:
+        from tools.crawler import Crawler
+        crawler = Crawler(
+            args.urls,
+            max_depth=args.depth,
+            max_pages=args.max_pages,
+            same_domain=not args.any_domain,
+            allow_domains=args.allow_domain,
+            include=args.include,
+            exclude=args.exclude,
+            workers=args.workers,
+            tabs=args.tabs or config.tabs_per_browser,
+            extract_mode=args.extract_mode,
+            wait_time=args.wait
+        )
+        output_file = crawler.crawl().save_to_file()
+        print(f"\nAll results saved to: {output_file}")
+    else:
+        process_urls(args.urls, max_workers=args.workers, adaptive=args.adaptive,
+                     extract_mode=args.extract_mode, tabs=args.tabs, wait_time=args.wait)
\ No newline at end of file